@@ -0,0 +1,113 @@
+"""
+Shared loader for resource/words.english.txt used by the chapter 3 benchmarks.
+
+The word list is read once per process and cached. With sidecar=True it is
+also pickled next to the text file, keyed by the file's modification time,
+so later processes skip splitting 321k lines. Words can be returned as str,
+interned str, bytes or a NumPy fixed-width byte array.
+"""
+import os
+import pickle
+import sys
+
+from itertools import islice
+
+WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resource", "words.english.txt")
+FORMS = ("str", "interned", "bytes", "numpy")
+
+_cache = {}
+
+
+def iter_english_words(limit=None, path=WORDS_FILE):
+    """Lazily yield the first limit words (all if None) without reading the rest."""
+    with open(path, 'r') as word_file:
+        for line in islice(word_file, limit):
+            yield line.rstrip("\n")
+
+
+def _convert(words, form):
+    if form == "str":
+        return words
+    if form == "interned":
+        return [sys.intern(w) for w in words]
+    if form == "bytes":
+        return [w.encode() for w in words]
+
+    import numpy as np
+    array = np.array([w.encode() for w in words], dtype=f"S{max(map(len, words), default=1)}")
+    array.flags.writeable = False
+    return array
+
+
+def _sidecar_path(path, form):
+    return f"{path}.{form}.cache"
+
+
+def _load_sidecar(path, form, mtime):
+    try:
+        with open(_sidecar_path(path, form), "rb") as f:
+            cached_mtime, words = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    return words if cached_mtime == mtime else None
+
+
+def _save_sidecar(path, form, mtime, words):
+    tmp = _sidecar_path(path, form) + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((mtime, words), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, _sidecar_path(path, form))
+
+
+def english_words(limit=None, form="str", sidecar=False, path=WORDS_FILE):
+    """
+    Return the first limit words (all if None) in the given form. Partial
+    loads stream only the needed lines unless the full list is cached.
+    List forms return a fresh list each call so callers may modify it.
+    """
+    if form not in FORMS:
+        raise ValueError(f"form must be one of {FORMS}.")
+
+    mtime = os.stat(path).st_mtime_ns
+    key = (path, form)
+    cached = _cache.get(key)
+    if cached is None or cached[0] != mtime:
+        if limit is not None and not sidecar:
+            return _convert(list(iter_english_words(limit, path)), form)
+
+        words = _load_sidecar(path, form, mtime) if sidecar else None
+        if words is None:
+            with open(path, 'r') as word_file:
+                words = _convert(word_file.read().splitlines(), form)
+            if sidecar:
+                _save_sidecar(path, form, mtime, words)
+        cached = _cache[key] = (mtime, words)
+
+    words = cached[1][:limit]
+    return words if form == "numpy" else list(words)
+
+
+if __name__ == "__main__":
+    import time
+
+    for form in FORMS:
+        _cache.clear()
+        start = time.perf_counter()
+        english_words(form=form, sidecar=True)
+        first = time.perf_counter() - start
+
+        _cache.clear()
+        start = time.perf_counter()
+        english_words(form=form, sidecar=True)
+        from_sidecar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        english_words(form=form)
+        in_process = time.perf_counter() - start
+        print(f"{form}: text + write sidecar {1000*first:.1f} ms, sidecar {1000*from_sidecar:.1f} ms, "
+              f"cached {1000*in_process:.1f} ms")
+
+    start = time.perf_counter()
+    _cache.clear()
+    english_words(160_564)
+    print(f"first 160,564 words streamed: {1000*(time.perf_counter() - start):.1f} ms")
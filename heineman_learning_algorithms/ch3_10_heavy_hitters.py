@@ -0,0 +1,235 @@
+# Approximate counting in bounded memory, as companions to the exact
+# most_duplicated() of ch3_8. Both structures can be merged, so partial
+# results computed by several workers over parts of a stream combine into
+# the summary of the whole stream.
+import hashlib
+import heapq
+import math
+import random
+import tracemalloc
+
+from array import array
+
+from ch3_8_most_duplicated import CountingHashtable, most_duplicated
+
+
+def stable_hash(x, seed=0):
+    """64-bit hash of repr(x) that is the same in every process, unlike hash()."""
+    digest = hashlib.blake2b(repr(x).encode(), digest_size=8,
+                             salt=seed.to_bytes(8, "little")).digest()
+    return int.from_bytes(digest, "little")
+
+
+class CountMinSketch:
+    """
+    depth rows of width counters. An estimate never undercounts and, with
+    probability 1 - delta, overcounts by at most epsilon * (total count)
+    when width = ceil(e / epsilon) and depth = ceil(ln(1 / delta)).
+    """
+    def __init__(self, width, depth, seed=0):
+        if width < 1 or depth < 1:
+            raise ValueError("Sketch needs at least one row and one column.")
+
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.rows = [array("q", bytes(8 * width)) for _ in range(depth)]
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, epsilon, delta, seed=0):
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), seed)
+
+    def columns(self, x):
+        # Kirsch-Mitzenmacher: derive every row's column from two halves of one hash
+        h = stable_hash(x, self.seed)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i*h2) % self.width for i in range(self.depth)]
+
+    def add(self, x, count=1):
+        """Count x and return its new estimate."""
+        estimate = None
+        for row, col in zip(self.rows, self.columns(x)):
+            row[col] += count
+            if estimate is None or row[col] < estimate:
+                estimate = row[col]
+        self.total += count
+        return estimate
+
+    def update(self, values):
+        for x in values:
+            self.add(x)
+
+    def estimate(self, x):
+        return min(row[col] for row, col in zip(self.rows, self.columns(x)))
+
+    def merge(self, other):
+        """Add the counts of a sketch built with the same width, depth and seed."""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Can only merge sketches with identical width, depth and seed.")
+
+        for row, other_row in zip(self.rows, other.rows):
+            for col in range(self.width):
+                row[col] += other_row[col]
+        self.total += other.total
+        return self
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-k summary with at most `capacity` counters kept in a
+    CountingHashtable. When full, the counter with the smallest count is
+    given to the new value, whose count then overestimates by at most the
+    evicted count (recorded as its error). Any value occurring more than
+    total/capacity times is guaranteed to be kept.
+    """
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("Space-Saving needs at least one counter.")
+
+        self.capacity = capacity
+        self.counts = CountingHashtable()
+        self.errors = {}
+        self.heap = []      # (count, seq, key) with stale entries, smallest first
+        self.seq = 0        # breaks ties between equal counts, so keys are never compared
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, epsilon):
+        """Counts overestimate by at most epsilon * total."""
+        return cls(math.ceil(1 / epsilon))
+
+    def min_counter(self):
+        """Pop stale heap entries until the top matches a live counter."""
+        while True:
+            count, _, key = self.heap[0]
+            if self.counts.get(key) == count:
+                return count, key
+            heapq.heappop(self.heap)
+
+    def add(self, x, count=1):
+        self.total += count
+        if self.counts.get(x) == 0 and len(self.counts) >= self.capacity:
+            min_count, min_key = self.min_counter()
+            heapq.heappop(self.heap)
+            self.counts.remove(min_key)
+            del self.errors[min_key]
+            self.errors[x] = min_count
+            count += min_count
+        elif x not in self.errors:
+            self.errors[x] = 0
+
+        new_count = self.counts.increment(x, count)
+        heapq.heappush(self.heap, self.entry(new_count, x))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [self.entry(c, k) for k, c in self.counts]
+            heapq.heapify(self.heap)
+
+    def entry(self, count, key):
+        self.seq += 1
+        return count, self.seq, key
+
+    def update(self, values):
+        for x in values:
+            self.add(x)
+
+    def estimate(self, x):
+        """Return (count, error); the true count lies in [count - error, count]."""
+        return self.counts.get(x), self.errors.get(x, 0)
+
+    def top(self, k):
+        """Return the k (key, count, error) triples with the highest counts."""
+        return [(key, count, self.errors[key]) for key, count in self.counts.top(k)]
+
+    def merge(self, other):
+        """
+        Combine with another summary. A value missing from one summary may
+        have occurred up to that summary's minimum count times, which is
+        added to both its count and its error before keeping the top counters.
+        """
+        def floor(summary):
+            if len(summary.counts) < summary.capacity:
+                return 0
+            return min(count for _, count in summary.counts)
+
+        floor_self, floor_other = floor(self), floor(other)
+        combined = {}
+        for key in set(k for k, _ in self.counts) | set(k for k, _ in other.counts):
+            c1, e1 = self.estimate(key) if key in self.errors else (floor_self, floor_self)
+            c2, e2 = other.estimate(key) if key in other.errors else (floor_other, floor_other)
+            combined[key] = (c1 + c2, e1 + e2)
+
+        kept = heapq.nlargest(self.capacity, combined.items(), key=lambda item: item[1][0])
+        total = self.total + other.total
+        self.__init__(self.capacity)
+        self.total = total
+        for key, (count, error) in kept:
+            self.counts.increment(key, count)
+            self.errors[key] = error
+            self.heap.append(self.entry(count, key))
+        heapq.heapify(self.heap)
+        return self
+
+
+def allocated(build):
+    """
+    Return (result of build(), bytes still allocated by it). build() runs
+    once untraced first, so one-time allocations (imports, caches of the
+    hashing code) are not charged to whichever structure is measured first.
+    """
+    build()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def zipf_stream(n, distinct, s=1.1, seed=3):
+    rng = random.Random(seed)
+    weights = [1 / (i ** s) for i in range(1, distinct + 1)]
+    return rng.choices(range(distinct), weights=weights, k=n)
+
+
+def count_exact(values):
+    counts = CountingHashtable()
+    counts.update(values)
+    return counts
+
+
+def summarize(make, values, workers):
+    """Summarize each worker's slice with its own make(), then merge them as a coordinator would."""
+    size = math.ceil(len(values) / workers)
+    parts = [make() for _ in range(workers)]
+    for i, part in enumerate(parts):
+        part.update(values[i*size:(i+1)*size])
+    for part in parts[1:]:
+        parts[0].merge(part)
+    return parts[0]
+
+
+def main(n=200_000, distinct=50_000, k=10, workers=4):
+    values = zipf_stream(n, distinct)
+
+    exact, exact_bytes = allocated(lambda: count_exact(values))
+    true_top = exact.top(k)
+    print(f"exact: {len(exact)} counters, {exact_bytes/1024:.0f} KiB, "
+          f"most_duplicated={most_duplicated(values)}")
+
+    for epsilon in [0.01, 0.001, 0.0001]:
+        cms, cms_bytes = allocated(
+            lambda: summarize(lambda: CountMinSketch.from_error(epsilon, 0.01), values, workers))
+        ss, ss_bytes = allocated(
+            lambda: summarize(lambda: SpaceSaving.from_error(epsilon), values, workers))
+
+        cms_error = max(cms.estimate(key) - count for key, count in true_top)
+        ss_keys = set(key for key, _, _ in ss.top(k))
+        recall = sum(1 for key, _ in true_top if key in ss_keys) / k
+        ss_error = max(ss.estimate(key)[0] - count for key, count in true_top)
+        print(f"epsilon={epsilon}: count-min {cms_bytes/1024:.0f} KiB, max top-{k} overcount {cms_error}; "
+              f"space-saving {ss_bytes/1024:.0f} KiB, top-{k} recall {recall:.0%}, max overcount {ss_error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Binary snapshot of an open addressing table of strings that can be queried
+# straight from a memory map, without reading the word list or rebuilding.
+#
+# Layout (little endian):
+#   header  MAGIC, m, n, arena offset
+#   slots   m records of (crc32 of key, used flag, arena offset, key length, value length)
+#   arena   key bytes immediately followed by value bytes, for every used slot
+#
+# Slots are placed by linear probing on crc32(key) % m, because hash() of a
+# str changes from one Python process to the next.
+import mmap
+import os
+import struct
+import time
+import zlib
+
+import ch3_1_hashtable_triangular_probing as ch3_1
+from ch3_0_words import WORDS_FILE, english_words
+
+MAGIC = b"HTSNAP01"
+HEADER = struct.Struct("<8sQQQ")
+SLOT = struct.Struct("<IIQII")
+
+
+def save_snapshot(pairs, path, load_factor=0.5):
+    """Write (key, value) string pairs to path as a snapshot, 0 < load_factor < 1."""
+    if not 0 < load_factor < 1:
+        raise ValueError("load_factor must lie strictly between 0 and 1.")
+
+    encoded = []
+    for k, v in pairs:
+        if not isinstance(k, str) or not isinstance(v, str):
+            raise TypeError(f"Snapshots only store str keys and values, not "
+                            f"{type(k).__name__} -> {type(v).__name__}.")
+        encoded.append((k.encode(), v.encode()))
+    pairs = encoded
+    n = len(pairs)
+    m = max(n + 1, int(n / load_factor)) | 1     # at least one empty slot ends every probe
+
+    slots = [None] * m
+    for k, v in pairs:
+        h = zlib.crc32(k)
+        hc = h % m
+        while slots[hc] is not None:
+            if slots[hc][1] == k:
+                break
+            hc = (hc + 1) % m
+        slots[hc] = (h, k, v)
+
+    arena_offset = HEADER.size + m * SLOT.size
+    slot_bytes = bytearray(m * SLOT.size)
+    arena = bytearray()
+    n = 0
+    for i, slot in enumerate(slots):
+        if slot is None:
+            continue
+        h, k, v = slot
+        SLOT.pack_into(slot_bytes, i * SLOT.size, h, 1, arena_offset + len(arena), len(k), len(v))
+        arena += k
+        arena += v
+        n += 1
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, m, n, arena_offset))
+        f.write(slot_bytes)
+        f.write(arena)
+
+
+class MappedHashtable:
+    """Read-only table answering get() directly from a memory-mapped snapshot."""
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.m, self.n, self.arena_offset = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a hashtable snapshot.")
+
+    def __len__(self):
+        return self.n
+
+    def get(self, k):
+        kb = k.encode()
+        h = zlib.crc32(kb)
+        hc = h % self.m
+        mm = self.mm
+        while True:
+            slot_h, used, offset, key_len, value_len = SLOT.unpack_from(mm, HEADER.size + hc * SLOT.size)
+            if not used:
+                return None
+            if slot_h == h and key_len == len(kb) and mm[offset:offset+key_len] == kb:
+                return mm[offset+key_len:offset+key_len+value_len].decode()
+            hc = (hc + 1) % self.m
+
+    def __iter__(self):
+        for i in range(self.m):
+            _, used, offset, key_len, value_len = SLOT.unpack_from(self.mm, HEADER.size + i * SLOT.size)
+            if used:
+                yield (self.mm[offset:offset+key_len].decode(),
+                       self.mm[offset+key_len:offset+key_len+value_len].decode())
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(path=None, ht_size=524_288, num_words=160_564):
+    if path is None:
+        path = os.path.join(os.path.dirname(WORDS_FILE), "words.english.snapshot")
+    words = english_words(num_words)
+    ht = ch3_1.HashtableOpenCompact(ht_size)
+    for w in words:
+        ht.put(w, w)
+    ht.save(path)
+    print(f"snapshot: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    start = time.perf_counter()
+    words = english_words(num_words)
+    ht = ch3_1.HashtableOpenCompact(ht_size)
+    for w in words:
+        ht.put(w, w)
+    ht.get("zebra")
+    rebuild = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mapped = ch3_1.HashtableOpenCompact.load(path)
+    mapped.get("zebra")
+    startup = time.perf_counter() - start
+    print(f"startup: rebuild from text {1000*rebuild:.1f} ms, open snapshot {1000*startup:.3f} ms")
+
+    for name, table in [("rebuilt", ht), ("mapped", mapped)]:
+        start = time.perf_counter()
+        for w in words:
+            table.get(w)
+        print(f"get() of every word, {name}: {time.perf_counter() - start:.3f}s")
+
+    assert all(mapped.get(w) == w for w in words)
+    mapped.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# Bucketized cuckoo hashing: every key lives in one of `slots` places of
+# one of two buckets (or in a small stash), so get() inspects at most
+# 2*slots + stash entries no matter how the table was filled. Both buckets
+# derive from hash(k), so keys with equal hash codes share them at every
+# size; when max_rehashes rebuilds cannot place such keys, the stash grows.
+#
+# Unlike the chapter's other tables it takes no ResizePolicy (ch3_7): most
+# rebuilds are forced by a failed placement rather than by the load, and
+# they keep or double M, a count of buckets rather than of slots.
+import random
+
+
+class HashtableCuckoo:
+    def __init__(self, M=16, slots=4, stash_size=4, seed=None):
+        if M < 2:
+            raise ValueError("There should be at least two buckets.")
+
+        self.M = M
+        self.slots = slots
+        self.stash_size = stash_size
+        self.max_kicks = 500
+        self.max_rehashes = 4
+        self.overflow = False   # the stash outgrew stash_size after the last rehash
+        self.load_factor = 0.9
+        self.rng = random.Random(seed)
+        self.salt = self.rng.getrandbits(64)
+
+        self.keys = [None] * (M * slots)
+        self.values = [None] * (M * slots)
+        self.stash = []         # [key, value] pairs that found no bucket
+        self.N = 0
+
+    def __len__(self):
+        return self.N
+
+    def buckets(self, k):
+        """First slot index of each of the two candidate buckets for k."""
+        h = hash(k)
+        b1 = h % self.M
+        b2 = hash((self.salt, h)) % self.M
+        if b2 == b1:
+            b2 = (b1 + 1) % self.M
+        return b1 * self.slots, b2 * self.slots
+
+    def find(self, k):
+        """Slot index of k, or -1 if it is not in a bucket. The second bucket is only hashed on a miss."""
+        keys = self.keys
+        slots = self.slots
+        M = self.M
+        h = hash(k)
+        b1 = h % M
+        start = b1 * slots
+        for i in range(start, start + slots):
+            if keys[i] == k:
+                return i
+
+        b2 = hash((self.salt, h)) % M
+        if b2 == b1:
+            b2 = (b1 + 1) % M
+        start = b2 * slots
+        for i in range(start, start + slots):
+            if keys[i] == k:
+                return i
+        return -1
+
+    def get(self, k):
+        i = self.find(k)
+        if i >= 0:
+            return self.values[i]
+        for pair in self.stash:
+            if pair[0] == k:
+                return pair[1]
+        return None
+
+    def put(self, k, v):
+        i = self.find(k)
+        if i >= 0:
+            self.values[i] = v
+            return
+        for pair in self.stash:
+            if pair[0] == k:
+                pair[1] = v
+                return
+
+        self.N += 1
+        if self.N > self.load_factor * len(self.keys):
+            self.rehash(2 * self.M)
+        self.insert(k, v)
+
+    def place(self, k, v):
+        """
+        Put a new key in a free slot of one of its buckets, evicting residents
+        to their other bucket when both are full. Returns None on success or
+        the (key, value) left homeless after max_kicks evictions.
+        """
+        keys = self.keys
+        for _ in range(self.max_kicks):
+            b1, b2 = self.buckets(k)
+            for start in (b1, b2):
+                for i in range(start, start + self.slots):
+                    if keys[i] is None:
+                        keys[i] = k
+                        self.values[i] = v
+                        return None
+
+            i = self.rng.choice((b1, b2)) + self.rng.randrange(self.slots)
+            keys[i], k = k, keys[i]
+            self.values[i], v = v, self.values[i]
+        return k, v
+
+    def insert(self, k, v):
+        homeless = self.place(k, v)
+        if homeless is None:
+            return
+        if self.overflow or len(self.stash) < self.stash_size:
+            self.stash.append(list(homeless))
+        else:
+            self.rehash(self.M, pending=homeless)
+
+    def rehash(self, new_size, pending=None):
+        """
+        Rebuild with a fresh salt, doubling the size until every pair fits.
+        After max_rehashes failures, rebuild at new_size with an unbounded stash.
+        """
+        pairs = list(self)
+        if pending is not None:
+            pairs.append(pending)
+
+        size = new_size
+        for _ in range(self.max_rehashes):
+            if self.rebuild(size, pairs, self.stash_size):
+                self.overflow = False
+                return
+            size *= 2
+
+        self.rebuild(new_size, pairs, None)
+        self.overflow = True
+
+    def rebuild(self, new_size, pairs, stash_size):
+        """Place pairs in new_size buckets; False once more than stash_size (unless None) are homeless."""
+        self.M = new_size
+        self.salt = self.rng.getrandbits(64)
+        self.keys = [None] * (new_size * self.slots)
+        self.values = [None] * (new_size * self.slots)
+        self.stash = []
+        for k, v in pairs:
+            homeless = self.place(k, v)
+            if homeless is not None:
+                if len(self.stash) == stash_size:
+                    return False
+                self.stash.append(list(homeless))
+        return True
+
+    def remove(self, k):
+        i = self.find(k)
+        if i >= 0:
+            value = self.values[i]
+            self.keys[i] = None
+            self.values[i] = None
+            self.N -= 1
+            return value
+        for idx, pair in enumerate(self.stash):
+            if pair[0] == k:
+                del self.stash[idx]
+                self.N -= 1
+                return pair[1]
+        return None
+
+    def __iter__(self):
+        for k, v in zip(self.keys, self.values):
+            if k is not None:
+                yield k, v
+        for k, v in self.stash:
+            yield k, v
@@ -0,0 +1,173 @@
+# DynamicHashtable that can be shared between threads. Writers lock only the
+# stripe owning their bucket, readers take no lock at all, and resize holds
+# every stripe while it builds a new table that is published in one step.
+import random
+import sys
+import threading
+import time
+
+from ch3_0_words import english_words
+from ch3_6_hashtable_resize import LinkedEntry
+from ch3_7_hashtable_downsize import ResizePolicy
+
+
+class StripedHashtable:
+    def __init__(self, M=1023, stripes=16, policy=None):
+        if M < 1:
+            raise ValueError("Storage must be at least 1.")
+
+        self.policy = policy or ResizePolicy(shrink_at=None)
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.counts = [0] * stripes     # entries per stripe, guarded by its lock
+        self.resize_lock = threading.Lock()
+
+        # (table, M) is swapped as one tuple so readers never mix two tables
+        self.state = ([None] * M, M)
+
+    def __len__(self):
+        return sum(self.counts)
+
+    @property
+    def M(self):
+        return self.state[1]
+
+    def get(self, k):
+        table, M = self.state
+        entry = table[hash(k) % M]
+        while entry:
+            if entry.key == k:
+                return entry.value
+            entry = entry.next
+        return None
+
+    def lock_bucket(self, k):
+        """Lock the stripe of k's bucket in the current table; returns (table, M, hc, stripe)."""
+        h = hash(k)
+        while True:
+            table, M = self.state
+            hc = h % M
+            stripe = hc % len(self.locks)
+            self.locks[stripe].acquire()
+            if self.state[0] is table:
+                return table, M, hc, stripe
+            self.locks[stripe].release()    # resized meanwhile, retry on new table
+
+    def put(self, k, v):
+        table, M, hc, stripe = self.lock_bucket(k)
+        try:
+            entry = table[hc]
+            while entry:
+                if entry.key == k:
+                    entry.value = v
+                    return
+                entry = entry.next
+
+            # Fully built before it is linked, so lock-free readers never see it half done
+            table[hc] = LinkedEntry(k, v, table[hc])
+            self.counts[stripe] += 1
+        finally:
+            self.locks[stripe].release()
+
+        n = sum(self.counts)
+        if n >= self.policy.threshold(M):
+            self.resize(self.policy.grow_size(n, M), M)
+
+    def remove(self, k):
+        table, M, hc, stripe = self.lock_bucket(k)
+        try:
+            entry = table[hc]
+            prev = None
+            while entry:
+                if entry.key == k:
+                    if prev:
+                        prev.next = entry.next
+                    else:
+                        table[hc] = entry.next
+                    self.counts[stripe] -= 1
+                    break
+                prev, entry = entry, entry.next
+            else:
+                return None
+        finally:
+            self.locks[stripe].release()
+
+        n = sum(self.counts)
+        if self.policy.should_shrink(n, M):
+            self.resize(self.policy.shrink_size(n, M), M)
+        return entry.value
+
+    def resize(self, new_size, expected_M):
+        """Resize unless another thread already did. Copies entries so readers of the old table are unaffected."""
+        with self.resize_lock:
+            if self.state[1] != expected_M:
+                return
+
+            for lock in self.locks:
+                lock.acquire()
+            try:
+                old_table, _ = self.state
+                self.policy.resized(sum(self.counts))
+                table = [None] * new_size
+                counts = [0] * len(self.locks)
+                for entry in old_table:
+                    while entry:
+                        hc = hash(entry.key) % new_size
+                        table[hc] = LinkedEntry(entry.key, entry.value, table[hc])
+                        counts[hc % len(self.locks)] += 1
+                        entry = entry.next
+                self.counts = counts
+                self.state = (table, new_size)
+            finally:
+                for lock in self.locks:
+                    lock.release()
+
+    def __iter__(self):
+        table, _ = self.state
+        for entry in table:
+            while entry:
+                yield entry.key, entry.value
+                entry = entry.next
+
+
+def worker(ht, words, ops, write_ratio, seed, done):
+    rng = random.Random(seed)
+    for _ in range(ops):
+        w = words[rng.randrange(len(words))]
+        if rng.random() < write_ratio:
+            ht.put(w, w)
+        else:
+            ht.get(w)
+    done.append(ops)
+
+
+def throughput(num_threads, write_ratio, words, ops_per_thread=100_000):
+    ht = StripedHashtable()
+    for w in words[:len(words) // 2]:
+        ht.put(w, w)
+
+    done = []
+    threads = [threading.Thread(target=worker, args=(ht, words, ops_per_thread, write_ratio, i, done))
+               for i in range(num_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(done) / (time.perf_counter() - start)
+
+
+def main():
+    gil = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled (free-threaded)'}")
+
+    words = english_words()
+    for write_ratio in [0.05, 0.5]:
+        base = None
+        for num_threads in [1, 2, 4, 8]:
+            ops = throughput(num_threads, write_ratio, words)
+            base = base or ops
+            print(f"writes {write_ratio:.0%}, {num_threads} threads: {ops:,.0f} ops/s ({ops/base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
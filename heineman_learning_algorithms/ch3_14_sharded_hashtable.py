@@ -0,0 +1,154 @@
+# Front-end that partitions keys by hash over worker processes, each owning
+# a DynamicHashtable shard. Requests are grouped per shard and sent as one
+# pickled batch over a pipe, and all shards work on their batch at the same
+# time.
+import multiprocessing as mp
+import time
+
+from ch3_6_hashtable_resize import DynamicHashtable
+
+
+def serve_shard(conn):
+    shard = DynamicHashtable(1023)
+    while True:
+        op, payload = conn.recv()
+        if op == "put_many":
+            shard.put_many(payload)
+            conn.send(None)
+        elif op == "get_many":
+            conn.send(shard.get_many(payload))
+        elif op == "remove_many":
+            conn.send([shard.remove(k) for k in payload])
+        elif op == "len":
+            conn.send(shard.N)
+        elif op == "stop":
+            conn.close()
+            return
+
+
+class ShardedHashtable:
+    def __init__(self, shards=4, batch_size=100_000):
+        if shards < 1:
+            raise ValueError("There must be at least one shard.")
+
+        self.batch_size = batch_size
+        self.conns = []
+        self.procs = []
+        for _ in range(shards):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=serve_shard, args=(child,), daemon=True)
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def partition(self, keys):
+        """Split keys per shard, remembering each key's position in the input."""
+        parts = [[] for _ in self.conns]
+        positions = [[] for _ in self.conns]
+        S = len(self.conns)
+        for i, k in enumerate(keys):
+            s = hash(k) % S
+            parts[s].append(k)
+            positions[s].append(i)
+        return parts, positions
+
+    def request(self, op, parts):
+        """Send every shard its part in batches, then collect replies in order."""
+        replies = [[] for _ in self.conns]
+        for start in range(0, max(len(part) for part in parts), self.batch_size):
+            busy = []
+            for s, part in enumerate(parts):
+                batch = part[start:start + self.batch_size]
+                if batch:
+                    self.conns[s].send((op, batch))
+                    busy.append(s)
+            for s in busy:
+                reply = self.conns[s].recv()
+                if reply is not None:
+                    replies[s].extend(reply)
+        return replies
+
+    def put_many(self, items):
+        parts = [[] for _ in self.conns]
+        S = len(self.conns)
+        for k, v in items:
+            parts[hash(k) % S].append((k, v))
+        self.request("put_many", parts)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        parts, positions = self.partition(keys)
+        result = [None] * len(keys)
+        for pos, values in zip(positions, self.request("get_many", parts)):
+            for i, v in zip(pos, values):
+                result[i] = v
+        return result
+
+    def remove_many(self, keys):
+        keys = list(keys)
+        parts, positions = self.partition(keys)
+        result = [None] * len(keys)
+        for pos, values in zip(positions, self.request("remove_many", parts)):
+            for i, v in zip(pos, values):
+                result[i] = v
+        return result
+
+    def put(self, k, v):
+        self.put_many([(k, v)])
+
+    def get(self, k):
+        return self.get_many([k])[0]
+
+    def remove(self, k):
+        return self.remove_many([k])[0]
+
+    def __len__(self):
+        for conn in self.conns:
+            conn.send(("len", None))
+        return sum(conn.recv() for conn in self.conns)
+
+    def close(self):
+        for conn, proc in zip(self.conns, self.procs):
+            conn.send(("stop", None))
+            conn.close()
+            proc.join()
+        self.conns = []
+        self.procs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(num_keys=2_000_000):
+    keys = list(range(0, 7 * num_keys, 7))
+    items = [(k, k) for k in keys]
+    print(f"{mp.cpu_count()} CPUs, {num_keys:,} keys")
+
+    start = time.perf_counter()
+    ht = DynamicHashtable(1023)
+    ht.put_many(items)
+    put_time = time.perf_counter() - start
+    start = time.perf_counter()
+    ht.get_many(keys)
+    get_time = time.perf_counter() - start
+    print(f"single process: put {num_keys/put_time:,.0f} ops/s, get {num_keys/get_time:,.0f} ops/s")
+    del ht
+
+    for shards in [1, 2, 4, 8]:
+        with ShardedHashtable(shards) as sharded:
+            start = time.perf_counter()
+            sharded.put_many(items)
+            put_time = time.perf_counter() - start
+            start = time.perf_counter()
+            values = sharded.get_many(keys)
+            get_time = time.perf_counter() - start
+            assert values == keys and len(sharded) == num_keys
+        print(f"{shards} shards: put {num_keys/put_time:,.0f} ops/s, get {num_keys/get_time:,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
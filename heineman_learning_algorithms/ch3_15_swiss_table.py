@@ -0,0 +1,171 @@
+# Swiss-table style open addressing. Slots come in groups of 16 and every
+# slot has a control byte: EMPTY, DELETED, or the low 7 bits of the key's
+# hash (h2). The remaining bits (h1) pick the first group to probe. A lookup
+# compares h2 against a whole group of control bytes at once and only looks
+# at keys whose fragment matches. get_many() does this with NumPy for every
+# key of a batch at the same time.
+import time
+
+import numpy as np
+
+from ch3_0_words import english_words
+from ch3_1_hashtable_triangular_probing import HashtableOpen
+from ch3_7_hashtable_downsize import ResizePolicy
+
+GROUP = 16
+EMPTY = 0x80
+DELETED = 0xFE
+
+
+class HashtableSwiss:
+    def __init__(self, groups=16, policy=None):
+        if groups < 1 or groups & (groups - 1):
+            raise ValueError("The number of groups must be a power of 2.")
+        if policy is None:
+            policy = ResizePolicy(grow_at=7/8, shrink_at=None, min_capacity=GROUP, sizing="pow2")
+        if policy.sizing != "pow2" or policy.min_capacity < GROUP:
+            raise ValueError(f"HashtableSwiss needs a policy with pow2 sizing and min_capacity >= {GROUP}.")
+
+        self.groups = groups
+        self.mask = groups - 1
+        self.ctrl = bytearray([EMPTY]) * (groups * GROUP)
+        self.ctrl_view = np.frombuffer(self.ctrl, dtype=np.uint8).reshape(groups, GROUP)
+        self.keys = np.empty(groups * GROUP, dtype=object)
+        self.values = np.empty(groups * GROUP, dtype=object)
+        self.N = 0
+        self.deleted = 0
+        self.policy = policy
+
+    def __len__(self):
+        return self.N
+
+    def find(self, k):
+        """Slot of k or -1, probing group after group until a group has an EMPTY slot."""
+        h = hash(k)
+        h2 = h & 0x7F
+        g = (h >> 7) & self.mask
+        ctrl = self.ctrl
+        keys = self.keys
+        for probe in range(self.groups):
+            start = ((g + probe) & self.mask) * GROUP
+            for i in range(start, start + GROUP):
+                if ctrl[i] == h2 and keys[i] == k:
+                    return i
+            if EMPTY in ctrl[start:start + GROUP]:
+                return -1
+        return -1
+
+    def get(self, k):
+        i = self.find(k)
+        return self.values[i] if i >= 0 else None
+
+    def put(self, k, v):
+        i = self.find(k)
+        if i >= 0:
+            self.values[i] = v
+            return
+
+        # Tombstones take slots too; when they outnumber live entries, purge them at the same size
+        capacity = len(self.ctrl)
+        if self.N + self.deleted + 1 > self.policy.threshold(capacity):
+            if self.N >= self.deleted:
+                capacity = self.policy.grow_size(self.N + 1, capacity)
+            self.resize(capacity // GROUP)
+
+        h = hash(k)
+        g = (h >> 7) & self.mask
+        ctrl = self.ctrl
+        for probe in range(self.groups):
+            start = ((g + probe) & self.mask) * GROUP
+            for i in range(start, start + GROUP):
+                if ctrl[i] == EMPTY or ctrl[i] == DELETED:
+                    if ctrl[i] == DELETED:
+                        self.deleted -= 1
+                    ctrl[i] = h & 0x7F
+                    self.keys[i] = k
+                    self.values[i] = v
+                    self.N += 1
+                    return
+
+    def remove(self, k):
+        i = self.find(k)
+        if i < 0:
+            return None
+        value = self.values[i]
+        self.ctrl[i] = DELETED
+        self.keys[i] = None
+        self.values[i] = None
+        self.N -= 1
+        self.deleted += 1
+        if self.policy.should_shrink(self.N, len(self.ctrl)):
+            self.resize(self.policy.shrink_size(self.N, len(self.ctrl)) // GROUP)
+        return value
+
+    def resize(self, new_groups):
+        self.policy.resized(self.N)
+        pairs = list(self)
+        self.__init__(new_groups, self.policy)
+        for k, v in pairs:
+            self.put(k, v)
+
+    def get_many(self, keys):
+        """Look up a whole batch: fragments are matched with NumPy, then candidate keys compared in bulk."""
+        n = len(keys)
+        query = np.empty(n, dtype=object)
+        query[:] = keys
+        h = np.fromiter(map(hash, keys), dtype=np.int64, count=n).view(np.uint64)
+        h2 = (h & np.uint64(0x7F)).astype(np.uint8)
+        home = ((h >> np.uint64(7)) & np.uint64(self.mask)).astype(np.int64)
+
+        result = np.empty(n, dtype=object)
+        pending = np.arange(n)
+        for probe in range(self.groups):
+            if len(pending) == 0:
+                break
+            groups = (home[pending] + probe) & self.mask
+            rows = self.ctrl_view[groups]                       # (pending, 16) control bytes
+
+            row, col = np.nonzero(rows == h2[pending, None])
+            slots = groups[row] * GROUP + col
+            hit = self.keys[slots] == query[pending[row]]
+            found = pending[row[hit]]
+            result[found] = self.values[slots[hit]]
+
+            done = np.zeros(len(pending), dtype=bool)
+            done[row[hit]] = True
+            done |= (rows == EMPTY).any(axis=1)                 # an EMPTY slot ends the probe sequence
+            pending = pending[~done]
+        return result.tolist()
+
+    def __iter__(self):
+        for i, c in enumerate(self.ctrl):
+            if c < 0x80:
+                yield self.keys[i], self.values[i]
+
+
+def main(num_words=160_564, ht_size=524_288):
+    words = english_words(num_words)
+    misses = [w + "-" for w in words]
+
+    ht_open = HashtableOpen(ht_size)
+    ht_swiss = HashtableSwiss(ht_size // GROUP)
+    for w in words:
+        ht_open.put(w, w)
+        ht_swiss.put(w, w)
+
+    for name, batch in [("hits", words), ("misses", misses)]:
+        start = time.perf_counter()
+        expected = [ht_open.get(w) for w in batch]
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        values = ht_swiss.get_many(batch)
+        many = time.perf_counter() - start
+
+        assert values == expected
+        print(f"{name}: HashtableOpen.get loop {loop:.3f}s, HashtableSwiss.get_many {many:.3f}s "
+              f"({loop/many:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
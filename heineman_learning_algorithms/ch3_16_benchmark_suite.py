@@ -0,0 +1,279 @@
+# One harness for every hashtable of chapter 3. Each table is built from the
+# same keys and timed with warmup runs and repeats (median and relative
+# standard deviation are reported). The suite also measures memory per entry,
+# key comparisons per get() and per-call latency percentiles. Results can be
+# written to JSON and compared with an earlier run, e.g. of another commit:
+#
+#   python ch3_16_benchmark_suite.py --keys words ints --json after.json --baseline before.json
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+
+import pandas as pd
+
+import ch3_1_hashtable_triangular_probing as ch3_1
+import ch3_2_hashtable_sorted_chains as ch3_2
+from ch3_0_words import english_words
+from ch3_3_bad_hash import ValueBadHash
+from ch3_4_prime_number import base26
+from ch3_5_hashtable_remove import Hashtable
+from ch3_6_hashtable_resize import DynamicHashtable, percentile
+from ch3_7_hashtable_downsize import HashtableOpenAddressingRemove
+from ch3_9_robin_hood import HashtableRobinHood
+from ch3_12_cuckoo_hashing import HashtableCuckoo
+
+BAD_HASH_LIMIT = 1_000      # ValueBadHash has 4 hash values, so every table is quadratic
+
+
+def power_of_two(m):
+    return 1 << (m - 1).bit_length()
+
+
+# Table name -> factory taking the number of slots
+TABLES = {
+    "open": ch3_1.HashtableOpen,
+    "open_compact": ch3_1.HashtableOpenCompact,
+    "triangular": lambda m: ch3_1.HashtableTriangleNumbers(power_of_two(m)),
+    "linked": ch3_1.HashtableLinked,
+    "sorted_chains": ch3_2.HashtableLinkedSortedChains,
+    "sorted_array_chains": ch3_2.HashtableSortedArrayChains,
+    "dynamic": DynamicHashtable,
+    "remove": Hashtable,
+    "downsize": HashtableOpenAddressingRemove,
+    "robin_hood": HashtableRobinHood,
+    "cuckoo": lambda m: HashtableCuckoo(max(2, m // 4)),
+}
+
+
+def word_keys(n):
+    words = english_words(n)
+    return words, [w + "-" for w in words]
+
+
+def int_keys(n):
+    return list(range(n)), list(range(n, 2*n))
+
+
+def base26_keys(n):
+    keys = list(dict.fromkeys(base26(w) for w in english_words(n)))
+    return keys, [-k - 1 for k in keys]
+
+
+def bad_hash_keys(n):
+    words = english_words(min(n, BAD_HASH_LIMIT))
+    return [ValueBadHash(w) for w in words], [ValueBadHash(w + "-") for w in words]
+
+
+# Distribution name -> function returning (keys, missing keys)
+KEYS = {
+    "words": word_keys,
+    "ints": int_keys,
+    "base26": base26_keys,
+    "bad_hash": bad_hash_keys,
+}
+
+
+class CountedKey:
+    """Wraps a key and counts every == and < a table performs on it."""
+    comparisons = 0
+
+    def __init__(self, key):
+        self.key = key
+        self.h = hash(key)
+
+    def __hash__(self):
+        return self.h
+
+    def __eq__(self, other):
+        CountedKey.comparisons += 1
+        return isinstance(other, CountedKey) and self.key == other.key
+
+    def __lt__(self, other):
+        CountedKey.comparisons += 1
+        return self.key < other.key
+
+
+def summary(values):
+    values = sorted(values)
+    return {
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 0.5),
+        "p90": percentile(values, 0.9),
+        "p99": percentile(values, 0.99),
+        "max": values[-1],
+    }
+
+
+def ops_per_sec(fn, ops, repeat, warmup):
+    """Median ops/s over `repeat` runs after `warmup` unmeasured ones, and its relative stdev."""
+    for _ in range(warmup):
+        fn()
+    rates = [ops / t for t in timeit.Timer(fn).repeat(repeat=repeat, number=1)]
+    rsd = statistics.stdev(rates) / statistics.mean(rates) if len(rates) > 1 else 0
+    return statistics.median(rates), rsd
+
+
+def build(make, size, keys):
+    ht = make(size)
+    for k in keys:
+        ht.put(k, k)
+    return ht
+
+
+def get_all(ht, keys):
+    for k in keys:
+        ht.get(k)
+
+
+def comparisons(make, size, keys, lookups):
+    """Key comparisons of every get(), with stored and looked up keys being distinct objects."""
+    ht = build(make, size, [CountedKey(k) for k in keys])
+    counts = []
+    for k in lookups:
+        key = CountedKey(k)
+        CountedKey.comparisons = 0
+        ht.get(key)
+        counts.append(CountedKey.comparisons)
+    return summary(counts)
+
+
+def latencies(ht, keys):
+    result = []
+    for k in keys:
+        start = time.perf_counter_ns()
+        ht.get(k)
+        result.append(time.perf_counter_ns() - start)
+    return summary(result)
+
+
+def bench(name, dist, n=20_000, size=None, repeat=5, warmup=1):
+    """Measure one table on one key distribution; size defaults to 2n slots."""
+    make = TABLES[name]
+    keys, misses = KEYS[dist](n)
+    size = size or 2 * len(keys)
+
+    ht = build(make, size, keys)
+    if any(ht.get(k) != k for k in keys) or any(ht.get(k) is not None for k in misses):
+        raise RuntimeError(f"{name} returned wrong values for {dist} keys.")
+
+    put, put_rsd = ops_per_sec(lambda: build(make, size, keys), len(keys), repeat, warmup)
+    get, get_rsd = ops_per_sec(lambda: get_all(ht, keys), len(keys), repeat, warmup)
+    miss, miss_rsd = ops_per_sec(lambda: get_all(ht, misses), len(misses), repeat, warmup)
+    return {
+        "table": name,
+        "keys": dist,
+        "n": len(keys),
+        "size": size,
+        "put_ops": put,
+        "put_rsd": put_rsd,
+        "get_ops": get,
+        "get_rsd": get_rsd,
+        "miss_ops": miss,
+        "miss_rsd": miss_rsd,
+        "bytes_per_entry": ch3_1.memory_per_entry(make, keys, size),
+        "hit_comparisons": comparisons(make, size, keys, keys),
+        "miss_comparisons": comparisons(make, size, keys, misses),
+        "get_ns": latencies(ht, keys),
+    }
+
+
+def run_suite(tables=None, keys=None, n=20_000, size=None, repeat=5, warmup=1):
+    results = []
+    for dist in keys or list(KEYS):
+        for name in tables or list(TABLES):
+            results.append(bench(name, dist, n, size, repeat, warmup))
+    return results
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def save(results, path, **config):
+    doc = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": config,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+
+def report(results):
+    rows = []
+    for r in results:
+        rows.append({
+            "table": r["table"],
+            "keys": r["keys"],
+            "n": r["n"],
+            "put/s": round(r["put_ops"]),
+            "get/s": round(r["get_ops"]),
+            "miss/s": round(r["miss_ops"]),
+            "rsd": f"{max(r['put_rsd'], r['get_rsd'], r['miss_rsd']):.1%}",
+            "B/entry": round(r["bytes_per_entry"], 1),
+            "cmp hit": round(r["hit_comparisons"]["mean"], 2),
+            "cmp miss": round(r["miss_comparisons"]["mean"], 2),
+            "cmp p99": r["hit_comparisons"]["p99"],
+            "get p50 ns": r["get_ns"]["p50"],
+            "get p99 ns": r["get_ns"]["p99"],
+        })
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False))
+    return df
+
+
+def compare(baseline_path, results):
+    """Change in ops/s against an earlier JSON run, for every (table, keys) present in both."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["table"], r["keys"]): r for r in baseline["results"]}
+    rows = []
+    for r in results:
+        old = before.get((r["table"], r["keys"]))
+        if old is None:
+            continue
+        row = {"table": r["table"], "keys": r["keys"]}
+        for op in ["put_ops", "get_ops", "miss_ops"]:
+            row[op.replace("_ops", "")] = f"{r[op] / old[op] - 1:+.1%}"
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    print(f"\nChange against {baseline_path} (commit {baseline['commit']}):")
+    print(df.to_string(index=False))
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the chapter 3 hashtables.")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=list(TABLES))
+    parser.add_argument("--keys", nargs="+", choices=list(KEYS), default=list(KEYS))
+    parser.add_argument("-n", type=int, default=20_000, help="number of keys")
+    parser.add_argument("--size", type=int, default=None, help="table slots (default 2n)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    config = {"tables": args.tables, "keys": args.keys, "n": args.n, "size": args.size,
+              "repeat": args.repeat, "warmup": args.warmup}
+    results = run_suite(args.tables, args.keys, args.n, args.size, args.repeat, args.warmup)
+    report(results)
+    if args.json:
+        save(results, args.json, **config)
+    if args.baseline:
+        compare(args.baseline, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
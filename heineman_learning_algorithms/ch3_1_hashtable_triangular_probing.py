@@ -1,12 +1,10 @@
-import timeit
 import math
+import tracemalloc
 
+from array import array
 
-def english_words():
-    word_file = open("resource/words.english.txt", 'r')
-    all_words = word_file.read().splitlines()
-    word_file.close()
-    return all_words
+import ch3_11_hashtable_snapshot as ch3_11
+from ch3_0_words import english_words
 
 
 class Entry:
@@ -22,7 +20,21 @@ class LinkedEntry:
         self.next = rest
 
 
-class HashtableOpen:
+class Snapshot:
+    """save() and load() of open addressing tables through ch3_11 snapshots."""
+    def save(self, path):
+        """
+        Write a snapshot that ch3_11 MappedHashtable can query without
+        rebuilding. Keys and values must be str; others raise TypeError.
+        """
+        ch3_11.save_snapshot(self, path)
+
+    @staticmethod
+    def load(path):
+        return ch3_11.MappedHashtable(path)
+
+
+class HashtableOpen(Snapshot):
     """Open addressing"""
     def __init__(self, m=10):
         self.table = [None] * m
@@ -51,6 +63,65 @@ class HashtableOpen:
         self.table[hc] = Entry(k, v)
         self.n += 1
 
+    def __iter__(self):
+        for entry in self.table:
+            if entry:
+                yield entry.key, entry.value
+
+
+class HashtableOpenCompact(Snapshot):
+    """Open addressing with keys, values and hash codes in parallel arrays"""
+    def __init__(self, m=10):
+        self.keys = [None] * m
+        self.values = [None] * m
+        self.hashes = array("q", bytes(8 * m))
+        self.m = m
+        self.n = 0
+
+    def get(self, k):
+        h = hash(k)
+        keys = self.keys
+        hashes = self.hashes
+        m = self.m
+        hc = h % m
+        key = keys[hc]
+        while key is not None:
+            if key is k or (hashes[hc] == h and key == k):
+                return self.values[hc]
+            hc = (hc + 1) % m
+            key = keys[hc]
+        return None
+
+    def put(self, k, v):
+        if k is None:
+            raise ValueError("None marks an empty slot and cannot be a key.")
+
+        h = hash(k)
+        keys = self.keys
+        hashes = self.hashes
+        m = self.m
+        hc = h % m
+        key = keys[hc]
+        while key is not None:
+            if key is k or (hashes[hc] == h and key == k):
+                self.values[hc] = v
+                return
+            hc = (hc + 1) % m
+            key = keys[hc]
+
+        if self.n >= m - 1:
+            raise RuntimeError("HashtableOpenCompact is full.")
+
+        keys[hc] = k
+        self.values[hc] = v
+        hashes[hc] = h
+        self.n += 1
+
+    def __iter__(self):
+        for k, v in zip(self.keys, self.values):
+            if k is not None:
+                yield k, v
+
 
 class HashtableTriangleNumbers:
     """Triangle probing"""
@@ -125,55 +196,22 @@ class HashtableLinked:
         self.N += 1
 
 
+def memory_per_entry(cls, words, m):
+    """Bytes allocated by the table per stored word (keys are shared, not counted)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ht = cls(m)
+    for word in words:
+        ht.put(word, word)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(words)
+
+
 if __name__ == "__main__":
+    from ch3_16_benchmark_suite import report, run_suite
+
     ht_size = 524_288
     num_words = 160_564
-    num_experiments = 20
-
-    timing1 = timeit.timeit(
-        stmt="""
-for word in words:
-    ht.get(word)
-        """,
-        setup=f"""
-from ch3_1_hashtable_triangular_probing import english_words, HashtableOpen
-words = english_words()
-words = words[:{num_words}]
-ht = HashtableOpen({ht_size})
-for word in words:
-    ht.put(word, word)
-        """, number=num_experiments)/num_experiments
-
-    print("Timing for linear probing hashtable:", round(timing1, 2))
-
-    timing2 = timeit.timeit(
-        stmt="""
-for word in words:
-    ht.get(word)
-            """,
-        setup=f"""
-from ch3_1_hashtable_triangular_probing import english_words, HashtableTriangleNumbers
-words = english_words()
-words = words[:{num_words}]
-ht = HashtableTriangleNumbers({ht_size})
-for word in words:
-    ht.put(word, word)
-            """, number=num_experiments)/num_experiments
-
-    print("Timing for triangular probing hashtable:", round(timing2, 2))
-
-    timing3 = timeit.timeit(
-        stmt="""
-for word in words:
-    ht.get(word)
-            """,
-        setup=f"""
-from ch3_1_hashtable_triangular_probing import english_words, HashtableLinked
-words = english_words()
-words = words[:{num_words}]
-ht = HashtableLinked({ht_size})
-for word in words:
-    ht.put(word, word)
-            """, number=num_experiments)/num_experiments
-
-    print("Timing for separate chaining hashtable:", round(timing3, 2))
+    report(run_suite(["open", "open_compact", "triangular", "linked", "cuckoo"], ["words"],
+                     n=num_words, size=ht_size))
@@ -1,12 +1,10 @@
+import heapq
 import timeit
 import math
 
+from bisect import bisect_left
 
-def english_words():
-    word_file = open("resource/words.english.txt", 'r')
-    all_words = word_file.read().splitlines()
-    word_file.close()
-    return all_words
+from ch3_0_words import english_words
 
 
 class Entry:
@@ -22,6 +20,18 @@ class LinkedEntry:
         self.next = rest
 
 
+def presize(expected_size, load_factor=0.75):
+    """
+    Smallest odd table size m whose load stays below load_factor, and below
+    m - 1, with expected_size entries. A DynamicHashtable of that size never
+    resizes while filling, as long as load_factor does not exceed its grow_at.
+    """
+    m = max(1, math.ceil(expected_size / load_factor)) | 1
+    while expected_size >= min(load_factor * m, m - 1):
+        m += 2
+    return m
+
+
 class HashtableOpen:
     """Open addressing"""
     def __init__(self, m=10):
@@ -80,6 +90,44 @@ class HashtableLinked:
         self.table[hc] = LinkedEntry(k, v, self.table[hc])
         self.N += 1
 
+    @classmethod
+    def from_items(cls, items, expected_size=None, load_factor=0.75):
+        """Build a table presized so all (k, v) pairs fill it below `load_factor`."""
+        items = list(items)
+        ht = cls(presize(len(items) if expected_size is None else expected_size, load_factor))
+        ht.put_many(items)
+        return ht
+
+    def put_many(self, items):
+        M = self.M
+        table = self.table
+        for k, v in items:
+            hc = hash(k) % M
+            entry = table[hc]
+            while entry:
+                if entry.key == k:
+                    entry.value = v
+                    break
+                entry = entry.next
+            else:
+                table[hc] = LinkedEntry(k, v, table[hc])
+                self.N += 1
+
+    def get_many(self, keys):
+        M = self.M
+        table = self.table
+        result = []
+        for k in keys:
+            entry = table[hash(k) % M]
+            while entry:
+                if entry.key == k:
+                    result.append(entry.value)
+                    break
+                entry = entry.next
+            else:
+                result.append(None)
+        return result
+
 
 class HashtableLinkedSortedChains:
     """Separate chaining with sorted keys"""
@@ -127,59 +175,157 @@ class HashtableLinkedSortedChains:
         prev.next = LinkedEntry(k,v)
         self.n += 1
 
+    @classmethod
+    def from_items(cls, items, expected_size=None, load_factor=0.75):
+        """Build a table presized so all (k, v) pairs fill it below `load_factor`."""
+        items = list(items)
+        ht = cls(presize(len(items) if expected_size is None else expected_size, load_factor))
+        ht.put_many(items)
+        return ht
+
+    def put_many(self, items):
+        m = self.m
+        table = self.table
+        for k, v in items:
+            hc = hash(k) % m
+            entry = table[hc]
+            prev = None
+            while entry and entry.key < k:
+                prev, entry = entry, entry.next
+
+            if entry and entry.key == k:
+                entry.value = v
+                continue
 
-if __name__ == "__main__":
-    ht_sizes = [214_219, 524_287, 999_983]
-    num_words = 160_564
-    num_exer = 10**7
+            if prev is None:
+                table[hc] = LinkedEntry(k, v, entry)
+            else:
+                prev.next = LinkedEntry(k, v, entry)
+            self.n += 1
 
-    for ht_size in ht_sizes:
-        print("\nHashtable size:", ht_size)
+    def get_many(self, keys):
+        m = self.m
+        table = self.table
+        result = []
+        for k in keys:
+            entry = table[hash(k) % m]
+            while entry and entry.key < k:
+                entry = entry.next
+            result.append(entry.value if entry and entry.key == k else None)
+        return result
 
-        timing1 = timeit.timeit(
-            stmt="""
-for word in words:
-    ht.get(word)
-            """,
-            setup=f"""
-from ch3_2_hashtable_sorted_chains import english_words, HashtableOpen
-words = english_words()
-words = reversed(words[:{num_words}])
-ht = HashtableOpen({ht_size})
-for word in words:
-    ht.put(word, word)
-            """, number=num_exer)
 
-        print("Timing for linear probing hashtable:", timing1)
+class HashtableSortedArrayChains:
+    """Separate chaining where each chain is a pair of sorted key/value lists"""
+    def __init__(self, m=10):
+        self.table = [None] * m
+        self.m = m
+        self.n = 0
 
-        timing2 = timeit.timeit(
-            stmt="""
-for word in words:
-    ht.get(word)
-                """,
-            setup=f"""
-from ch3_2_hashtable_sorted_chains import english_words, HashtableLinked
-words = english_words()
-words = reversed(words[:{num_words}])
-ht = HashtableLinked({ht_size})
-for word in words:
-    ht.put(word, word)
-                """, number=num_exer)
+    def get(self, k):
+        chain = self.table[hash(k) % self.m]
+        if chain is None:
+            return None
+        keys = chain[0]
+        i = bisect_left(keys, k)
+        if i < len(keys) and keys[i] == k:
+            return chain[1][i]
+        return None
 
-        print("Timing for separate chaining hashtable:", timing2)
+    def put(self, k, v):
+        hc = hash(k) % self.m
+        chain = self.table[hc]
+        if chain is None:
+            self.table[hc] = ([k], [v])
+            self.n += 1
+            return
+
+        keys, values = chain
+        i = bisect_left(keys, k)
+        if i < len(keys) and keys[i] == k:
+            values[i] = v
+            return
 
-        timing3 = timeit.timeit(
+        keys.insert(i, k)
+        values.insert(i, v)
+        self.n += 1
+
+    def remove(self, k):
+        hc = hash(k) % self.m
+        chain = self.table[hc]
+        if chain is None:
+            return None
+
+        keys, values = chain
+        i = bisect_left(keys, k)
+        if i == len(keys) or keys[i] != k:
+            return None
+
+        del keys[i]
+        value = values.pop(i)
+        if not keys:
+            self.table[hc] = None
+        self.n -= 1
+        return value
+
+    def items_sorted(self):
+        """All (key, value) pairs in key order, by a heap merge of the sorted chains."""
+        # Keys are unique, so comparing pairs never falls through to the values
+        chains = [zip(*chain) for chain in self.table if chain is not None]
+        return heapq.merge(*chains)
+
+    def __iter__(self):
+        for chain in self.table:
+            if chain is not None:
+                yield from zip(*chain)
+
+
+def bulk_load_trial(num_words=160_564, repeat=5):
+    words = english_words(num_words)
+    pairs = [(w, w) for w in words]
+    m = int(num_words / 0.75) | 1
+
+    for cls in [HashtableLinked, HashtableLinkedSortedChains]:
+        single = min(timeit.repeat(
             stmt="""
-for word in words:
-    ht.get(word)
-                """,
-            setup=f"""
-from ch3_2_hashtable_sorted_chains import english_words, HashtableLinkedSortedChains
-words = english_words()
-words = reversed(words[:{num_words}])
-ht = HashtableLinkedSortedChains({ht_size})
+ht = cls(m)
 for word in words:
     ht.put(word, word)
-                """, number=num_exer)
+            """,
+            globals={"cls": cls, "m": m, "words": words}, number=1, repeat=repeat))
 
-        print("Timing for separate chaining hashtable with sorted chains:", timing3)
+        bulk = min(timeit.repeat(
+            stmt="cls.from_items(pairs)",
+            globals={"cls": cls, "pairs": pairs}, number=1, repeat=repeat))
+
+        assert cls.from_items(pairs).get_many(words) == words
+        print(f"{cls.__name__}: one-by-one put {single:.3f}s, from_items {bulk:.3f}s")
+
+
+def sorted_chains_trial(num_words=160_564, m=20_011, repeat=5):
+    """Misses and ordered scans on a small table, where chains are long."""
+    words = english_words(num_words)
+    misses = [w + "-" for w in words]
+    for cls in [HashtableLinkedSortedChains, HashtableSortedArrayChains]:
+        ht = cls(m)
+        for w in words:
+            ht.put(w, w)
+        miss = min(timeit.repeat(lambda: [ht.get(w) for w in misses], number=1, repeat=repeat))
+        print(f"{cls.__name__}: {miss:.3f}s for {num_words} misses")
+
+    scan = min(timeit.repeat(lambda: list(ht.items_sorted()), number=1, repeat=repeat))
+    full_sort = min(timeit.repeat(lambda: sorted(ht), number=1, repeat=repeat))
+    assert list(ht.items_sorted()) == sorted(ht)
+    print(f"items_sorted(): {scan:.3f}s, sorted(ht): {full_sort:.3f}s")
+
+
+if __name__ == "__main__":
+    bulk_load_trial()
+    sorted_chains_trial()
+
+    from ch3_16_benchmark_suite import report, run_suite
+
+    for ht_size in [214_219, 524_287, 999_983]:
+        print("\nHashtable size:", ht_size)
+        report(run_suite(["open", "linked", "sorted_chains", "sorted_array_chains"], ["words"],
+                         n=160_564, size=ht_size))
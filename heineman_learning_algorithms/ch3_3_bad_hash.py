@@ -1,8 +1,9 @@
-def english_words():
-    word_file = open("resource/words.english.txt", 'r')
-    all_words = word_file.read().splitlines()
-    word_file.close()
-    return all_words
+import random
+import time
+
+from bisect import bisect_left
+
+from ch3_0_words import english_words
 
 
 class ValueBadHash:
@@ -15,6 +16,79 @@ class ValueBadHash:
     def __eq__(self, other):
         return self.__class__ == other.__class__ and self.v == other.v
 
+    def __lt__(self, other):
+        return self.v < other.v
+
+
+class ChainMetrics:
+    """Snapshot of the chain statistics HashtableLinked keeps up to date on put/remove."""
+    def __init__(self, N, M, non_empty, max_length, total_search, histogram):
+        self.N = N
+        self.M = M
+        self.non_empty = non_empty
+        self.max_length = max_length
+        self.total_search = total_search
+        self.histogram = histogram
+
+    @property
+    def avg(self):
+        """Average length of a non-empty chain."""
+        return self.N/self.non_empty if self.non_empty else 0
+
+    @property
+    def avg_search(self):
+        """Average number of entries inspected by a successful get()."""
+        return self.total_search/self.N if self.N else 0
+
+    def as_dict(self):
+        return {
+            "N": self.N,
+            "M": self.M,
+            "non_empty": self.non_empty,
+            "avg": self.avg,
+            "max_length": self.max_length,
+            "avg_search": self.avg_search,
+            "histogram": dict(self.histogram),
+        }
+
+
+class ChainStatistics:
+    """Running chain statistics of a separate chaining table, so get_stats() never walks it."""
+    def __init__(self, m):
+        self.lengths = [0] * m
+        self.non_empty = 0
+        self.max_length = 0
+        self.total_search = 0
+        self.histogram = {0: m}     # chain length -> number of buckets
+
+    def record(self, hc, delta):
+        """Move bucket hc from chain length L to L+delta."""
+        old = self.lengths[hc]
+        new = old + delta
+        self.lengths[hc] = new
+
+        self.histogram[old] -= 1
+        if self.histogram[old] == 0:
+            del self.histogram[old]
+        self.histogram[new] = self.histogram.get(new, 0) + 1
+
+        if old == 0:
+            self.non_empty += 1
+        elif new == 0:
+            self.non_empty -= 1
+
+        # The entry at position i of a chain costs i to find
+        self.total_search += new if delta > 0 else -old
+
+        if new > self.max_length:
+            self.max_length = new
+        elif old == self.max_length and old not in self.histogram:
+            self.max_length = new   # the shortened chain is now the longest
+
+    def metrics(self, N):
+        return ChainMetrics(N, len(self.lengths), self.non_empty, self.max_length,
+                            self.total_search, dict(self.histogram))
+
 
 class LinkedEntry:
     def __init__(self, k, v, rest=None):
@@ -29,10 +103,13 @@ class HashtableLinked:
         self.table = [None] * m
         self.M = m
         self.N = 0
+        self.stats = ChainStatistics(m)
+
+    def index(self, k):
+        return hash(k) % self.M
 
     def get(self, k):
-        hc = hash(k) % self.M
-        entry = self.table[hc]
+        entry = self.table[self.index(k)]
         while entry:
             if entry.key == k:
                 return entry.value
@@ -40,7 +117,7 @@ class HashtableLinked:
         return None
 
     def put(self, k, v):
-        hc = hash(k) % self.M
+        hc = self.index(k)
         entry = self.table[hc]
         while entry:
             if entry.key == k:
@@ -50,43 +127,210 @@ class HashtableLinked:
 
         self.table[hc] = LinkedEntry(k, v, self.table[hc])
         self.N += 1
+        self.stats.record(hc, +1)
 
+    def remove(self, k):
+        hc = self.index(k)
+        entry = self.table[hc]
+        prev = None
+        while entry:
+            if entry.key == k:
+                if prev:
+                    prev.next = entry.next
+                else:
+                    self.table[hc] = entry.next
+                self.N -= 1
+                self.stats.record(hc, -1)
+                return entry.value
+
+            prev, entry = entry, entry.next
+        return None
+
+    def metrics(self):
+        return self.stats.metrics(self.N)
+
+
+class SortedBucket:
+    """Chain converted to parallel sorted key/value arrays searched with bisect."""
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, k):
+        try:
+            i = bisect_left(self.keys, k)
+        except TypeError:
+            # k cannot be ordered against the stored keys, but may still equal one
+            return next((i for i, key in enumerate(self.keys) if key == k), -1)
+        if i < len(self.keys) and self.keys[i] == k:
+            return i
+        return -1
+
+    def to_chain(self):
+        chain = None
+        for k, v in zip(self.keys, self.values):
+            chain = LinkedEntry(k, v, chain)
+        return chain
 
-def get_stats(ht):
-    size = len(ht.table)
-    sizes = {}
-    total_search = 0
-    max_length = 0
-    total_non_empty = 0
-    for i in range(size):
-        num = 0
-        idx = i
-        entry = ht.table[idx]
-        total_non_empty += 1 if entry else 0
 
+class HashtableTreeified(HashtableLinked):
+    """
+    Separate chaining that turns any chain longer than treeify_threshold
+    into a SortedBucket, so lookups in a flooded bucket cost O(log n), and
+    back into a chain when it shrinks below untreeify_threshold. Keys of a
+    long chain must be orderable; otherwise the chain is left (or turned
+    back into) a linked list, and not treeified again until it shrinks.
+
+    With salt_on_flood the first long chain instead rehashes the table
+    through hash((salt, hash(k))). That spreads keys whose hash codes
+    differ but collide modulo M; keys with equal hash codes (ValueBadHash)
+    still collide and are treeified.
+    """
+    def __init__(self, m=10, treeify_threshold=8, untreeify_threshold=6, salt_on_flood=False):
+        super().__init__(m)
+        self.treeify_threshold = treeify_threshold
+        self.untreeify_threshold = untreeify_threshold
+        self.salt_on_flood = salt_on_flood
+        self.salt = None
+        self.treeified = 0
+        self.floods = 0
+        self.unorderable = set()    # buckets whose keys cannot be sorted
+
+    def index(self, k):
+        if self.salt is None:
+            return hash(k) % self.M
+        return hash((self.salt, hash(k))) % self.M
+
+    def get(self, k):
+        bucket = self.table[self.index(k)]
+        if type(bucket) is SortedBucket:
+            i = bucket.find(k)
+            return bucket.values[i] if i >= 0 else None
+
+        while bucket:
+            if bucket.key == k:
+                return bucket.value
+            bucket = bucket.next
+        return None
+
+    def put(self, k, v):
+        hc = self.index(k)
+        bucket = self.table[hc]
+        if type(bucket) is SortedBucket:
+            try:
+                i = bisect_left(bucket.keys, k)
+            except TypeError:
+                # k cannot be ordered against the stored keys: back to a chain
+                self.untreeify(hc)
+                self.unorderable.add(hc)
+            else:
+                if i < len(bucket.keys) and bucket.keys[i] == k:
+                    bucket.values[i] = v
+                    return
+                bucket.keys.insert(i, k)
+                bucket.values.insert(i, v)
+                self.N += 1
+                self.stats.record(hc, +1)
+                return
+
+        entry = self.table[hc]
         while entry:
+            if entry.key == k:
+                entry.value = v
+                return
             entry = entry.next
-            num += 1
-            total_search += num
+        self.table[hc] = LinkedEntry(k, v, self.table[hc])
+        self.N += 1
+        self.stats.record(hc, +1)
+
+        if self.stats.lengths[hc] > self.treeify_threshold and hc not in self.unorderable:
+            self.flooded(hc)
+
+    def remove(self, k):
+        hc = self.index(k)
+        bucket = self.table[hc]
+        if type(bucket) is not SortedBucket:
+            value = super().remove(k)
+            if self.stats.lengths[hc] < self.untreeify_threshold:
+                self.unorderable.discard(hc)
+            return value
+
+        i = bucket.find(k)
+        if i < 0:
+            return None
+        del bucket.keys[i]
+        value = bucket.values.pop(i)
+        self.N -= 1
+        self.stats.record(hc, -1)
 
-        if num in sizes:
-            sizes[num] = sizes[num] + 1
+        if len(bucket) < self.untreeify_threshold:
+            self.untreeify(hc)
+        return value
+
+    def flooded(self, hc):
+        """Chain at hc grew past the threshold: salt the hash once, else treeify."""
+        self.floods += 1
+        if self.salt_on_flood and self.salt is None:
+            self.salt = random.getrandbits(64)
+            self.rehash()
+            for idx in range(self.M):
+                if self.stats.lengths[idx] > self.treeify_threshold:
+                    self.treeify(idx)
         else:
-            sizes[num] = 1
+            self.treeify(hc)
 
-        if num > max_length:
-            max_length = num
+    def treeify(self, hc):
+        pairs = []
+        entry = self.table[hc]
+        while entry:
+            pairs.append((entry.key, entry.value))
+            entry = entry.next
+        try:
+            pairs.sort(key=lambda pair: pair[0])
+        except TypeError:
+            self.unorderable.add(hc)
+            return
+        self.table[hc] = SortedBucket([k for k, _ in pairs], [v for _, v in pairs])
+        self.treeified += 1
 
-    if total_non_empty == 0:
-        return 0, 0
+    def untreeify(self, hc):
+        self.table[hc] = self.table[hc].to_chain()
+        self.treeified -= 1
 
-    return ht.N/total_non_empty, max_length
+    def rehash(self):
+        pairs = list(self)
+        HashtableLinked.__init__(self, self.M)
+        self.treeified = 0
+        self.unorderable = set()
+        for k, v in pairs:
+            hc = self.index(k)
+            self.table[hc] = LinkedEntry(k, v, self.table[hc])
+            self.N += 1
+            self.stats.record(hc, +1)
+
+    def __iter__(self):
+        for bucket in self.table:
+            if type(bucket) is SortedBucket:
+                yield from zip(bucket.keys, bucket.values)
+                continue
+            while bucket:
+                yield bucket.key, bucket.value
+                bucket = bucket.next
+
+
+def get_stats(ht):
+    """Average non-empty chain length and longest chain, in O(1)."""
+    metrics = ht.metrics()
+    return metrics.avg, metrics.max_length
 
 
 def main(size=10):
     good_ht = HashtableLinked(size)
     bad_ht = HashtableLinked(size)
-    words = english_words()[:5000]
+    words = english_words(5000)
 
     for w in words:
         good_ht.put(w, True)
@@ -98,6 +342,24 @@ def main(size=10):
     return result
 
 
+def treeify_trial(sizes=(1000, 2000, 4000, 8000, 16000), size=50000):
+    """Time lookups of every ValueBadHash key as the four flooded chains grow."""
+    words = english_words()
+    for n in sizes:
+        keys = [ValueBadHash(w) for w in words[:n]]
+        for cls in [HashtableLinked, HashtableTreeified]:
+            ht = cls(size)
+            for k in keys:
+                ht.put(k, True)
+
+            start = time.perf_counter()
+            for k in keys:
+                ht.get(k)
+            per_lookup = (time.perf_counter() - start) / n
+            print(f"n={n} {cls.__name__}: {1e6 * per_lookup:.2f} us per get")
+
+
 if __name__ == "__main__":
     result = main(50000)
     print(result)
+    treeify_trial()
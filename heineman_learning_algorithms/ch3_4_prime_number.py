@@ -1,11 +1,12 @@
+import numpy as np
 import pandas as pd
+import random
 
+from concurrent.futures import ProcessPoolExecutor
 
-def english_words():
-    word_file = open("resource/words.english.txt", 'r')
-    all_words = word_file.read().splitlines()
-    word_file.close()
-    return all_words
+import ch3_3_bad_hash as ch3_3
+from ch3_0_words import english_words
+from ch3_3_bad_hash import get_stats  # noqa: F401
 
 
 def base26(w):
@@ -16,6 +17,109 @@ def base26(w):
     return val
 
 
+_MERSENNE61 = (1 << 61) - 1
+
+
+def _times_26_mod_mersenne(x):
+    """26*x mod 2**61-1 for uint64 x < 2**61-1 without overflowing 64 bits."""
+    p = np.uint64(_MERSENNE61)
+    total = np.zeros_like(x)
+    for s in (1, 3, 4):  # 26 = 2 + 8 + 16, each shift is a 61-bit rotation
+        total += ((x << np.uint64(s)) & p) | (x >> np.uint64(61 - s))
+    return total
+
+
+def base26_array(words):
+    """
+    Vectorized hash(base26(w)) for a whole word list. Python hashes a
+    non-negative int as its value modulo 2**61-1, so Horner's rule is
+    evaluated modulo that prime and matches hash(base26(w)) exactly.
+    That requires words of the letters a-z only: any other character
+    makes a negative digit, and raises ValueError here.
+    """
+    lowered = [w.lower() for w in words]
+    for w in lowered:
+        if w and not (w.isascii() and w.isalpha()):
+            raise ValueError(f"base26_array only accepts letters a-z, not {w!r}.")
+
+    width = max(len(w) for w in lowered)
+    chars = np.array(lowered, dtype=f"S{width}")
+    digits = chars.view(np.uint8).reshape(len(words), width).astype(np.uint64)
+    lengths = np.char.str_len(chars)
+
+    p = np.uint64(_MERSENNE61)
+    val = np.zeros(len(words), dtype=np.uint64)
+    for j in range(width):
+        active = lengths > j
+        nxt = _times_26_mod_mersenne(val) + (digits[:, j] - np.uint64(ord("a")))
+        nxt = (nxt & p) + (nxt >> np.uint64(61))
+        nxt = np.where(nxt >= p, nxt - p, nxt)
+        val = np.where(active, nxt, val)
+    return val.astype(np.int64)
+
+
+class ModHash:
+    """hash(k) % m, the scheme every table in this chapter uses."""
+    def __init__(self, m):
+        self.m = m
+
+    def index(self, k):
+        return hash(k) % self.m
+
+    def index_array(self, hashes):
+        return hashes % self.m
+
+
+class FibonacciHash:
+    """Multiplicative hashing: top bits of hash(k) * 2**64/phi, m must be a power of 2."""
+    MULTIPLIER = 11400714819323198485
+    MASK = (1 << 64) - 1
+
+    def __init__(self, m):
+        bits = m.bit_length() - 1
+        if m < 2 or m != 2 ** bits:
+            raise ValueError("The parameter 'm' must be a power of 2.")
+
+        self.m = m
+        self.shift = 64 - bits
+
+    def index(self, k):
+        return ((hash(k) * self.MULTIPLIER) & self.MASK) >> self.shift
+
+    def index_array(self, hashes):
+        product = hashes.astype(np.uint64) * np.uint64(self.MULTIPLIER)
+        return (product >> np.uint64(self.shift)).astype(np.int64)
+
+
+class TabulationHash:
+    """Simple tabulation: XOR of a random 64-bit word per byte of hash(k)."""
+    def __init__(self, m, seed=None):
+        rng = random.Random(seed)
+        self.m = m
+        self.tables = [[rng.getrandbits(64) for _ in range(256)] for _ in range(8)]
+        self.np_tables = np.array(self.tables, dtype=np.uint64)
+
+    def index(self, k):
+        h = hash(k) & 0xFFFFFFFFFFFFFFFF
+        val = 0
+        for table in self.tables:
+            val ^= table[h & 0xFF]
+            h >>= 8
+        return val % self.m
+
+    def index_array(self, hashes):
+        h = hashes.astype(np.uint64)
+        val = np.zeros_like(h)
+        for i in range(8):
+            val ^= self.np_tables[i][(h >> np.uint64(8*i)) & np.uint64(0xFF)]
+        return (val % np.uint64(self.m)).astype(np.int64)
+
+
+def bucket_indices(words, m, strategy=ModHash):
+    """Bucket of base26(w) for every word, computed for the whole list at once."""
+    return strategy(m).index_array(base26_array(words))
+
+
 class Entry:
     def __init__(self, k, v):
         self.key = k
@@ -59,90 +163,63 @@ class HashtableOpen:
         self.n += 1
 
 
-class HashtableLinked:
-    """Separate chaining"""
-    def __init__(self, m=10):
-        self.table = [None] * m
-        self.M = m
-        self.N = 0
-
-    def get(self, k):
-        hc = hash(k) % self.M
-        entry = self.table[hc]
-        while entry:
-            if entry.key == k:
-                return entry.value
-            entry = entry.next
-        return None
-
-    def put(self, k, v):
-        hc = hash(k) % self.M
-        entry = self.table[hc]
-        while entry:
-            if entry.key == k:
-                entry.value = v
-                return
-            entry = entry.next
-
-        self.table[hc] = LinkedEntry(k, v, self.table[hc])
-        self.N += 1
+class HashtableLinked(ch3_3.HashtableLinked):
+    """Separate chaining with a pluggable bucket index (ModHash, FibonacciHash, TabulationHash)."""
+    def __init__(self, m=10, strategy=ModHash):
+        super().__init__(m)
+        self.hasher = strategy(m)
 
+    def index(self, k):
+        return self.hasher.index(k)
 
-def get_stats(ht):
-    size = len(ht.table)
-    sizes = {}
-    total_search = 0
-    max_length = 0
-    total_non_empty = 0
-    for i in range(size):
-        num = 0
-        idx = i
-        entry = ht.table[idx]
-        total_non_empty += 1 if entry else 0
 
-        while entry:
-            entry = entry.next
-            num += 1
-            total_search += num
+def _sweep_chunk(keys, sizes, strategy):
+    rows = []
+    for m in sizes:
+        counts = np.bincount(strategy(m).index_array(keys), minlength=m)
+        total_non_empty = np.count_nonzero(counts)
+        rows.append({
+            "m": m,
+            "avg": len(keys)/total_non_empty if total_non_empty else 0,
+            "max": int(counts.max()),
+            "histogram": np.bincount(counts).tolist(),
+        })
+    return rows
 
-        if num in sizes:
-            sizes[num] = sizes[num] + 1
-        else:
-            sizes[num] = 1
 
-        if num > max_length:
-            max_length = num
+def sweep_table_sizes(keys, sizes, strategy=ModHash, processes=None, chunk_size=64):
+    """
+    Chain length statistics of every table size in sizes without building
+    any table. keys are hash codes (e.g. from base26_array); histogram[i]
+    is the number of buckets holding exactly i keys. With processes > 1
+    the sizes are split in chunks over a process pool.
+    """
+    sizes = list(sizes)
+    chunks = [sizes[i:i+chunk_size] for i in range(0, len(sizes), chunk_size)]
 
-    if total_non_empty == 0:
-        return 0, 0
+    if processes is None or processes <= 1:
+        results = [_sweep_chunk(keys, chunk, strategy) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(_sweep_chunk, keys, chunk, strategy) for chunk in chunks]
+            results = [f.result() for f in futures]
 
-    return ht.N/total_non_empty, max_length
+    return pd.DataFrame([row for rows in results for row in rows])
 
 
-def main():
-    df = pd.DataFrame({"m": [], "avg": [], "max": [], "is_prime": []})
+def main(lo=428_880, hi=428_980, processes=None):
     words = english_words()
-
-    lo = 428_880
     primes = [428_899, 428_951, 428_957, 428_977]
-    hi = 428_980
-
-    keys = [base26(w) for w in words]
-
-    for m in range(lo, hi+1):
-        print("m =", m)
-        ht_linked = HashtableLinked(m)
-
-        for k in keys:
-            ht_linked.put(k, 1)
 
-        avg_linked, max_linked = get_stats(ht_linked)
-        is_prime = m in primes
-        temp = pd.DataFrame({"m": [m], "avg": [avg_linked], "max": [max_linked], "is_prime": [is_prime]})
-        df = pd.concat([df, temp], ignore_index=True)
+    # Words with leading 'a' share base26 values with shorter words; keep
+    # distinct keys only, as HashtableLinked.put would.
+    keys = np.unique(base26_array(words))
 
+    df = sweep_table_sizes(keys, range(lo, hi+1), processes=processes)
+    df["is_prime"] = df["m"].isin(primes)
     return df
 
 
 if __name__ == "__main__":
     df = main()
+    print(df[["m", "avg", "max", "is_prime"]])
@@ -2,6 +2,13 @@
 # Element is marked as deleted so that the chain is not broken
 # Separate chaining is faster than open addressing with remove
 
+import random
+import time
+
+from ch3_0_words import english_words
+from ch3_7_hashtable_downsize import ResizePolicy
+
+
 class MarkedEntry:
     def __init__(self, k, v):
         self.key = k
@@ -19,7 +26,15 @@ class MarkedEntry:
 
 
 class Hashtable:
-    def __init__(self, M=10):
+    """
+    compact_ratio: rehash at the same size once tombstones exceed this
+    fraction of M, and compact instead of growing when the table is full
+    mostly because of tombstones. shrink_factor: halve the table when live
+    entries drop to this fraction of M, never below min_M. Both are off by
+    default, which keeps the grow-only behaviour. A ResizePolicy replaces
+    shrink_factor and min_M when given.
+    """
+    def __init__(self, M=10, compact_ratio=None, shrink_factor=None, min_M=11, policy=None):
         if M < 2:
             raise ValueError("Hastable must contain >= 2 pairs.")
 
@@ -27,22 +42,50 @@ class Hashtable:
         self.M = M
         self.N = 0
         self.deleted = 0
-        self.load_factor = 0.75
-        self.threshold = min(M * self.load_factor, M-1)
+        self.policy = policy or ResizePolicy(shrink_at=shrink_factor, min_capacity=min_M)
+        self.threshold = self.policy.threshold(M)
+
+        self.compact_ratio = compact_ratio
+        self.compactions = 0
+        self.shrinks = 0
+        self.lookups = 0
+        self.probes = 0
 
     def __len__(self):
         return self.N
 
     def get(self, k):
         hc = hash(k) % self.M
+        probes = 1
         while self.table[hc]:
             if self.table[hc].key == k and not self.table[hc].is_marked():
+                self.lookups += 1
+                self.probes += probes
                 return self.table[hc].value
             hc = (hc + 1) % self.M
+            probes += 1
+        self.lookups += 1
+        self.probes += probes
         return None
 
+    def metrics(self):
+        return {
+            "M": self.M,
+            "N": self.N,
+            "tombstones": self.deleted,
+            "compactions": self.compactions,
+            "shrinks": self.shrinks,
+            "avg_probe_length": self.probes / self.lookups if self.lookups else 0,
+        }
+
+    def compact(self):
+        """Rehash at the same size, dropping every tombstone."""
+        self.compactions += 1
+        self.resize(self.M)
+
     def resize(self, new_size):
-        temp = Hashtable(new_size)
+        self.policy.resized(self.N)
+        temp = Hashtable(new_size, policy=self.policy)
         for n in self.table:
             if n and not n.is_marked():
                 temp.put(n.key, n.value)
@@ -50,7 +93,7 @@ class Hashtable:
         self.table = temp.table
         temp.table = None
         self.M = temp.M
-        self.threshold = self.load_factor * self.M
+        self.threshold = temp.threshold
         self.deleted = 0
 
     def remove(self, k):
@@ -63,7 +106,16 @@ class Hashtable:
                 self.table[hc].mark()
                 self.N -= 1
                 self.deleted += 1
-                return self.table[hc].value
+                value = self.table[hc].value
+
+                if self.policy.should_shrink(self.N, self.M):
+                    self.shrinks += 1
+                    self.resize(self.policy.shrink_size(self.N, self.M))
+                    return value
+
+                if self.compact_ratio is not None and self.deleted > self.compact_ratio * self.M:
+                    self.compact()
+                return value
             hc = (hc + 1) % self.M
         return None
 
@@ -84,9 +136,51 @@ class Hashtable:
         self.N += 1
 
         if self.N + self.deleted >= self.threshold:
-            self.resize(2*self.M + 1)
+            if self.compact_ratio is not None and self.N < self.threshold / 2:
+                self.compact()
+            else:
+                self.resize(self.policy.grow_size(self.N, self.M))
 
     def __iter__(self):
         for entry in self.table:
             if entry is not None and not entry.is_marked():
                 yield entry.key, entry.value
+
+
+def churn_trial(cycles=20, churn=0.25, seed=5):
+    """
+    Load the word list, then repeatedly remove a random quarter of the live
+    words and insert a quarter of fresh ones. Reports the steady state table
+    size, tombstones and lookup cost with and without the compaction policy.
+    """
+    words = english_words()
+    half = len(words) // 2
+    for name, ht in [("grow only", Hashtable(1023)),
+                     ("compact + shrink", Hashtable(1023, compact_ratio=0.25, shrink_factor=0.2))]:
+        rng = random.Random(seed)
+        live = words[:half]
+        spare = words[half:]
+        for w in live:
+            ht.put(w, w)
+
+        for _ in range(cycles):
+            rng.shuffle(live)
+            cut = int(churn * len(live))
+            for w in live[:cut]:
+                ht.remove(w)
+            fresh = spare[:cut]
+            spare = spare[cut:] + live[:cut]
+            live = live[cut:] + fresh
+            for w in fresh:
+                ht.put(w, w)
+
+        ht.lookups = ht.probes = 0
+        start = time.perf_counter()
+        for w in live:
+            ht.get(w)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {ht.metrics()}, {1e6 * elapsed / len(live):.2f} us per get")
+
+
+if __name__ == "__main__":
+    churn_trial()
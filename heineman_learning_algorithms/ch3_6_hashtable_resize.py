@@ -1,12 +1,11 @@
+import gc
 import pandas as pd
 import time
+import timeit
 
-
-def english_words():
-    word_file = open("resource/words.english.txt", 'r')
-    all_words = word_file.read().splitlines()
-    word_file.close()
-    return all_words
+import ch3_2_hashtable_sorted_chains as ch3_2
+from ch3_0_words import english_words
+from ch3_7_hashtable_downsize import ResizePolicy
 
 
 class CountableHash:
@@ -30,25 +29,16 @@ class LinkedEntry:
         self.next = rest
 
 
-class DynamicHashtable:
-    def __init__(self, M=10):
+class DynamicHashtable(ch3_2.HashtableLinked):
+    def __init__(self, M=10, policy=None):
         if M < 1:
             raise ValueError("Storage must be at least 1.")
 
         self.table = [None] * M
         self.M = M
         self.N = 0
-        self.load_factor = 0.75
-        self.threshold = min(M * self.load_factor, M-1)
-
-    def get(self, k):
-        hc = hash(k) % self.M
-        entry = self.table[hc]
-        while entry:
-            if entry.key == k:
-                return entry.value
-            entry = entry.next
-        return None
+        self.policy = policy or ResizePolicy(shrink_at=None)
+        self.threshold = self.policy.threshold(M)
 
     def put(self, k, v):
         hc = hash(k) % self.M
@@ -63,10 +53,18 @@ class DynamicHashtable:
         self.N += 1
 
         if self.N >= self.threshold:
-            self.resize(2*self.M + 1)
+            self.resize(self.policy.grow_size(self.N, self.M))
+
+    def put_many(self, items):
+        """Resize at most once, to hold every new pair, then insert them in one pass."""
+        items = list(items)
+        if self.N + len(items) >= self.threshold:
+            self.resize(self.policy.grow_size(self.N + len(items), self.M))
+        super().put_many(items)
 
     def resize(self, new_size):
-        temp = DynamicHashtable(new_size)
+        self.policy.resized(self.N)
+        temp = DynamicHashtable(new_size, self.policy)
         for n in self.table:
             while n:
                 temp.put(n.key, n.value)
@@ -74,7 +72,7 @@ class DynamicHashtable:
         self.table = temp.table
         temp.table = None
         self.M = temp.M
-        self.threshold = self.load_factor * self.M
+        self.threshold = temp.threshold
 
     def remove(self, k):
         hc = hash(k) % self.M
@@ -87,6 +85,8 @@ class DynamicHashtable:
                 else:
                     self.table[hc] = entry.next
                 self.N -= 1
+                if self.policy.should_shrink(self.N, self.M):
+                    self.resize(self.policy.shrink_size(self.N, self.M))
                 return entry.value
 
             prev, entry = entry, entry.next
@@ -99,21 +99,211 @@ class DynamicHashtable:
                 entry = entry.next
 
 
-def main():
-    words = english_words()
-    ht_dynamic = DynamicHashtable(1023)
+class IncrementalHashtable:
+    """
+    Separate chaining where resize keeps the old table alive and every
+    operation migrates at most `step` old buckets into the new one.
+    """
+    def __init__(self, M=10, step=4, policy=None):
+        if M < 1:
+            raise ValueError("Storage must be at least 1.")
+        if step < 2:
+            raise ValueError("Must migrate at least 2 buckets per operation.")
+
+        self.table = [None] * M
+        self.M = M
+        self.N = 0
+        self.policy = policy or ResizePolicy(shrink_at=None)
+        self.threshold = self.policy.threshold(M)
+        self.step = step
+
+        self.old_table = None
+        self.old_M = 0
+        self.migrated = 0       # old buckets below this index are already moved
+
+    def is_resizing(self):
+        return self.old_table is not None
+
+    def _old_chain(self, h):
+        """Index of the not yet migrated old bucket for hash h, or -1."""
+        if self.old_table is None:
+            return -1
+        idx = h % self.old_M
+        return idx if idx >= self.migrated else -1
+
+    def get(self, k):
+        h = hash(k)
+        self.migrate()
+        entry = self.table[h % self.M]
+        while entry:
+            if entry.key == k:
+                return entry.value
+            entry = entry.next
+
+        idx = self._old_chain(h)
+        if idx >= 0:
+            entry = self.old_table[idx]
+            while entry:
+                if entry.key == k:
+                    return entry.value
+                entry = entry.next
+        return None
+
+    def put(self, k, v):
+        h = hash(k)
+        self.migrate()
+        idx = self._old_chain(h)
+        if idx >= 0:
+            entry = self.old_table[idx]
+            while entry:
+                if entry.key == k:
+                    entry.value = v
+                    return
+                entry = entry.next
+
+        hc = h % self.M
+        entry = self.table[hc]
+        while entry:
+            if entry.key == k:
+                entry.value = v
+                return
+            entry = entry.next
+
+        self.table[hc] = LinkedEntry(k, v, self.table[hc])
+        self.N += 1
+
+        if self.N >= self.threshold and self.old_table is None:
+            self.start_resize(self.policy.grow_size(self.N, self.M))
+
+    def start_resize(self, new_size):
+        """Works for shrinking too: migrate() rehashes into whatever size the new table has."""
+        self.policy.resized(self.N)
+        self.old_table = self.table
+        self.old_M = self.M
+        self.migrated = 0
+        self.table = [None] * new_size
+        self.M = new_size
+        self.threshold = self.policy.threshold(new_size)
+
+    def migrate(self):
+        """Move up to `step` buckets from the old table into the new one."""
+        if self.old_table is None:
+            return
+
+        end = min(self.migrated + self.step, self.old_M)
+        for idx in range(self.migrated, end):
+            entry = self.old_table[idx]
+            self.old_table[idx] = None
+            while entry:
+                nxt = entry.next
+                hc = hash(entry.key) % self.M
+                entry.next = self.table[hc]
+                self.table[hc] = entry
+                entry = nxt
+        self.migrated = end
+
+        if self.migrated == self.old_M:
+            self.old_table = None
+            self.old_M = 0
+            self.migrated = 0
+
+    def remove(self, k):
+        h = hash(k)
+        self.migrate()
+        for table, hc in ((self.table, h % self.M), (self.old_table, self._old_chain(h))):
+            if hc < 0:
+                continue
+            entry = table[hc]
+            prev = None
+            while entry:
+                if entry.key == k:
+                    if prev:
+                        prev.next = entry.next
+                    else:
+                        table[hc] = entry.next
+                    self.N -= 1
+                    if self.old_table is None and self.policy.should_shrink(self.N, self.M):
+                        self.start_resize(self.policy.shrink_size(self.N, self.M))
+                    return entry.value
+
+                prev, entry = entry, entry.next
+        return None
+
+    def __iter__(self):
+        tables = [self.table]
+        if self.old_table is not None:
+            tables.append(self.old_table)
+        for table in tables:
+            for entry in table:
+                while entry:
+                    yield entry.key, entry.value
+                    entry = entry.next
+
+
+def put_latencies(ht, words):
+    """Time every put() and print each new worst case as it happens."""
+    latencies = []
     max_cost = 0
-    ct = 0
-    for w in words:
-        start = time.time()
-        ht_dynamic.put(CountableHash(w), w)
-        end = time.time()
-        cost = end - start
+    gc.disable()    # a full collection would otherwise dominate the maximum
+    for ct, w in enumerate(words):
+        start = time.perf_counter()
+        ht.put(CountableHash(w), w)
+        cost = time.perf_counter() - start
+        latencies.append(cost)
         if cost > max_cost:
             max_cost = cost
-            print(f"{ct}: {end-start}")
-        ct += 1
+            print(f"{ct}: {cost}")
+    gc.enable()
+    return latencies
+
+
+def percentile(sorted_values, q):
+    idx = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[idx]
+
+
+def main():
+    words = english_words()
+    tables = [
+        ("stop-the-world", DynamicHashtable(1023)),
+        ("incremental", IncrementalHashtable(1023)),
+    ]
+
+    report = []
+    for name, ht in tables:
+        print(f"\n{name} resizing, new worst put latencies:")
+        CountableHash.hash_count = 0
+        latencies = sorted(put_latencies(ht, words))
+        report.append({
+            "resizing": name,
+            "p50 (us)": 1e6 * percentile(latencies, 0.5),
+            "p99 (us)": 1e6 * percentile(latencies, 0.99),
+            "max (us)": 1e6 * latencies[-1],
+            "hash calls": CountableHash.hash_count,
+        })
+
+    df = pd.DataFrame(report)
+    print()
+    print(df.to_string(index=False))
+    return df
+
+
+def bulk_load_trial(repeat=3):
+    words = english_words()
+    pairs = [(w, w) for w in words]
+
+    def one_by_one():
+        ht = DynamicHashtable(1023)
+        for w in words:
+            ht.put(w, w)
+
+    single = min(timeit.repeat(one_by_one, number=1, repeat=repeat))
+    bulk = min(timeit.repeat(lambda: DynamicHashtable.from_items(pairs), number=1, repeat=repeat))
+
+    assert DynamicHashtable.from_items(pairs).get_many(words) == words
+    print(f"one-by-one put: {single:.3f}s, from_items: {bulk:.3f}s")
 
 
 if __name__ == "__main__":
     main()
+    bulk_load_trial()
@@ -1,3 +1,92 @@
+import math
+
+
+def is_prime(n):
+    if n < 2:
+        return False
+    if n % 2 == 0:
+        return n == 2
+    f = 3
+    while f * f <= n:
+        if n % f == 0:
+            return False
+        f += 2
+    return True
+
+
+class ResizePolicy:
+    """
+    When a table resizes and to what size. A table grows once N >= grow_at*M
+    and shrinks once N <= shrink_at*M (never, if shrink_at is None), but never
+    below min_capacity. Without target_load sizes double and halve. With it,
+    the new size brings the load back to target_load, inside the band, so a
+    workload that oscillates near a threshold cannot resize on every swing.
+
+    sizing is "odd" (2M+1, as in the book), "prime" or "pow2". For a power
+    of two, hash(k) % M keeps only the low bits of the hash code. Power-of-two
+    sizes move in steps of 2x, so they need a wider band (e.g. shrink_at=0.2)
+    to get hysteresis.
+
+    resizes and rehashed count the resizes and the entries they moved.
+    """
+    SIZINGS = ("odd", "prime", "pow2")
+
+    def __init__(self, grow_at=0.75, shrink_at=0.25, target_load=None, min_capacity=2, sizing="odd"):
+        if sizing not in self.SIZINGS:
+            raise ValueError(f"sizing must be one of {self.SIZINGS}.")
+        if target_load is not None and not (shrink_at or 0) < target_load < grow_at:
+            raise ValueError("target_load must lie between shrink_at and grow_at.")
+
+        self.grow_at = grow_at
+        self.shrink_at = shrink_at
+        self.target_load = target_load
+        self.min_capacity = min_capacity
+        self.sizing = sizing
+        self.resizes = 0
+        self.rehashed = 0
+
+    def fit(self, size):
+        """Smallest allowed capacity >= size."""
+        size = max(self.min_capacity, math.ceil(size))
+        if self.sizing == "pow2":
+            return 1 << (size - 1).bit_length()
+        if self.sizing == "prime":
+            while not is_prime(size):
+                size += 1
+            return size
+        return size | 1
+
+    def threshold(self, M):
+        return min(self.grow_at * M, M - 1)
+
+    def holding(self, size, n):
+        """Smallest allowed capacity >= size whose threshold lies above n."""
+        size = self.fit(size)
+        while self.threshold(size) <= n:
+            size = self.fit(size + 1)
+        return size
+
+    def grow_size(self, n, M):
+        """Capacity larger than M that holds n entries without growing again."""
+        if self.target_load is None:
+            return self.holding(2 * M, n)
+        return self.holding(max(M + 1, n / self.target_load), n)
+
+    def should_shrink(self, n, M):
+        return (self.shrink_at is not None and n <= self.shrink_at * M
+                and self.shrink_size(n, M) < M)
+
+    def shrink_size(self, n, M):
+        """Capacity that holds n entries without growing again (should_shrink checks it is below M)."""
+        if self.target_load is None:
+            return self.holding(M // 2, n)
+        return self.holding(n / self.target_load, n)
+
+    def resized(self, n):
+        self.resizes += 1
+        self.rehashed += n
+
+
 class Entry:
     def __init__(self, k, v):
         self.key = k
@@ -5,17 +94,16 @@ class Entry:
 
 
 class HashtableOpenAddressingRemove:
-    def __init__(self, M=10):
+    def __init__(self, M=10, policy=None):
         if M < 2:
             raise ValueError("There should be space for at least two pairs.")
 
         self.table = [None] * M
         self.M = M
         self.N = 0
-        self.load_factor = 0.75
-        self.shrink_factor = 0.25
+        self.policy = policy or ResizePolicy()
 
-        self.threshold = min(M * self.load_factor, M-1)
+        self.threshold = self.policy.threshold(M)
 
     def get(self, k):
         hc = hash(k) % self.M
@@ -40,17 +128,18 @@ class HashtableOpenAddressingRemove:
         self.N += 1
 
         if self.N >= self.threshold:
-            self.resize(2*self.M + 1)
+            self.resize(self.policy.grow_size(self.N, self.M))
 
     def resize(self, new_size):
-        temp = HashtableOpenAddressingRemove(new_size)
+        self.policy.resized(self.N)
+        temp = HashtableOpenAddressingRemove(new_size, self.policy)
         for n in self.table:
             if n:
                 temp.put(n.key, n.value)
         self.table = temp.table
         temp.table = None
         self.M = temp.M
-        self.threshold = self.load_factor * self.M
+        self.threshold = temp.threshold
 
     def remove(self, k):
         hc = hash(k) % self.M
@@ -74,11 +163,8 @@ class HashtableOpenAddressingRemove:
             self.put(entry.key, entry.value)
             hc = (hc + 1) % self.M
 
-        if 0 < self.N <= self.shrink_factor * self.M:
-            new_size = self.M // 2
-            if new_size % 2 == 0:
-                new_size += 1
-            self.resize(new_size)
+        if self.N > 0 and self.policy.should_shrink(self.N, self.M):
+            self.resize(self.policy.shrink_size(self.N, self.M))
 
         return result
 
@@ -87,3 +173,56 @@ class HashtableOpenAddressingRemove:
             if entry:
                 yield entry.key, entry.value
 
+
+def oscillation_trial(low=500, high=770, cycles=50):
+    """
+    Fill to high, then swing between low and high entries. The book policy
+    grows at 0.75*M and halves at 0.25*M, which this range keeps crossing.
+    """
+    policies = [
+        ("double/halve, odd", lambda: ResizePolicy()),
+        ("hysteresis, odd", lambda: ResizePolicy(target_load=0.5)),
+        ("hysteresis, prime", lambda: ResizePolicy(target_load=0.5, sizing="prime")),
+        ("hysteresis, pow2", lambda: ResizePolicy(shrink_at=0.2, target_load=0.5, sizing="pow2")),
+    ]
+    for name, make in policies:
+        policy = make()
+        ht = HashtableOpenAddressingRemove(policy.fit(1000), policy)
+        for k in range(high):
+            ht.put(k, k)
+        for _ in range(cycles):
+            for k in range(low, high):
+                ht.remove(k)
+            for k in range(low, high):
+                ht.put(k, k)
+        assert sorted(k for k, _ in ht) == list(range(high))
+        print(f"{name}: M={ht.M}, {policy.resizes} resizes, {policy.rehashed:,} entries rehashed")
+
+
+def drain_trial(n=1000):
+    """Remove all but one entry, then all of them, and fill up again, under every sizing."""
+    policies = [
+        ("double/halve, odd", lambda: ResizePolicy()),
+        ("hysteresis, odd", lambda: ResizePolicy(target_load=0.5)),
+        ("hysteresis, prime", lambda: ResizePolicy(target_load=0.5, sizing="prime")),
+        ("hysteresis, pow2", lambda: ResizePolicy(shrink_at=0.2, target_load=0.5, sizing="pow2")),
+    ]
+    for name, make in policies:
+        policy = make()
+        ht = HashtableOpenAddressingRemove(101, policy)
+        for k in range(n):
+            ht.put(k, k)
+        for k in range(1, n):
+            ht.remove(k)
+        assert list(ht) == [(0, 0)]
+        smallest = ht.M
+        ht.remove(0)
+        for k in range(n):
+            ht.put(k, k)
+        assert sorted(k for k, _ in ht) == list(range(n))
+        print(f"{name}: drained to M={smallest}, refilled to M={ht.M}, {policy.resizes} resizes")
+
+
+if __name__ == "__main__":
+    oscillation_trial()
+    drain_trial()
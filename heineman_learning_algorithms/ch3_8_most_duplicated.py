@@ -1,3 +1,11 @@
+import heapq
+import random
+
+from itertools import islice
+
+from ch3_7_hashtable_downsize import ResizePolicy
+
+
 class LinkedEntry:
     def __init__(self, k, v, rest=None):
         self.key = k
@@ -39,7 +47,149 @@ class Hashtable:
                 entry = entry.next
 
 
+class CountingHashtable:
+    """
+    Separate chaining table of counts that resizes like DynamicHashtable.
+    increment() hashes its key once and keeps track of the current maximum.
+    """
+    def __init__(self, M=10, policy=None):
+        if M < 1:
+            raise ValueError("Storage must be at least 1.")
+
+        self.table = [None] * M
+        self.M = M
+        self.N = 0
+        self.policy = policy or ResizePolicy(shrink_at=None)
+        self.threshold = self.policy.threshold(M)
+
+        self.most = 0
+        self.most_key = None
+        self.most_stale = False     # a decrement may have lowered the maximum
+
+    def get(self, k):
+        entry = self.table[hash(k) % self.M]
+        while entry:
+            if entry.key == k:
+                return entry.value
+            entry = entry.next
+        return 0
+
+    def increment(self, k, delta=1):
+        """Add delta to the count of k and return the new count."""
+        hc = hash(k) % self.M
+        entry = self.table[hc]
+        while entry:
+            if entry.key == k:
+                entry.value += delta
+                count = entry.value
+                break
+            entry = entry.next
+        else:
+            self.table[hc] = LinkedEntry(k, delta, self.table[hc])
+            self.N += 1
+            count = delta
+            if self.N >= self.threshold:
+                self.resize(self.policy.grow_size(self.N, self.M))
+
+        if count > self.most:
+            self.most = count
+            self.most_key = k
+        elif delta < 0 and k == self.most_key:
+            self.most_stale = True
+        return count
+
+    def remove(self, k):
+        """Forget k entirely and return its count."""
+        hc = hash(k) % self.M
+        entry = self.table[hc]
+        prev = None
+        while entry:
+            if entry.key == k:
+                if prev:
+                    prev.next = entry.next
+                else:
+                    self.table[hc] = entry.next
+                self.N -= 1
+                if k == self.most_key:
+                    self.most_stale = True
+                if self.policy.should_shrink(self.N, self.M):
+                    self.resize(self.policy.shrink_size(self.N, self.M))
+                return entry.value
+
+            prev, entry = entry, entry.next
+        return 0
+
+    def update(self, values):
+        """Count every value of an iterable (one chunk of a stream)."""
+        for v in values:
+            self.increment(v)
+
+    def resize(self, new_size):
+        self.policy.resized(self.N)
+        table = [None] * new_size
+        for entry in self.table:
+            while entry:
+                nxt = entry.next
+                hc = hash(entry.key) % new_size
+                entry.next = table[hc]
+                table[hc] = entry
+                entry = nxt
+        self.table = table
+        self.M = new_size
+        self.threshold = self.policy.threshold(new_size)
+
+    def most_common(self):
+        """Return (key, count) with the highest count."""
+        if self.most_stale:
+            self.most_key, self.most = None, 0
+            for k, count in self:
+                if self.most_key is None or count > self.most:
+                    self.most_key, self.most = k, count
+            self.most_stale = False
+        return self.most_key, self.most
+
+    def top(self, k):
+        """Return the k (key, count) pairs with the highest counts."""
+        return heapq.nlargest(k, self, key=lambda pair: pair[1])
+
+    def __len__(self):
+        return self.N
+
+    def __iter__(self):
+        for entry in self.table:
+            while entry:
+                yield entry.key, entry.value
+                entry = entry.next
+
+
 def most_duplicated(A):
+    counts = CountingHashtable()
+    counts.update(A)
+
+    # As in most_duplicated_book, A[0] wins ties (and an empty A raises IndexError)
+    result = A[0]
+    key, most = counts.most_common()
+    if most > counts.get(result):
+        result = key
+    return result
+
+
+def heavy_hitters(values, k=10, chunk_size=65_536):
+    """
+    Top-k most frequent values of any iterable, consumed chunk_size values
+    at a time so the input never needs to be materialized as a list.
+    """
+    counts = CountingHashtable()
+    it = iter(values)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            break
+        counts.update(chunk)
+    return counts.top(k)
+
+
+def most_duplicated_book(A):
     ht = Hashtable()
 
     for v in A:
@@ -62,3 +212,5 @@ if __name__ == "__main__":
     print(most_duplicated([1, 2, 3, 4]))
     print(most_duplicated([7, 8, 7, 9]))
 
+    values = (int(random.paretovariate(1.2)) for _ in range(10**6))
+    print(heavy_hitters(values, k=5))
@@ -0,0 +1,188 @@
+# Robin Hood hashing: linear probing where an entry that has travelled further
+# from its home slot takes the place of a "richer" entry closer to home.
+# Removal shifts the rest of the cluster one slot back, so there are no
+# tombstones and no reinsertion of the whole cluster.
+import random
+import time
+
+from ch3_0_words import english_words
+from ch3_5_hashtable_remove import Hashtable
+from ch3_7_hashtable_downsize import HashtableOpenAddressingRemove, ResizePolicy
+
+
+class HashtableRobinHood:
+    def __init__(self, M=10, policy=None):
+        if M < 2:
+            raise ValueError("There should be space for at least two pairs.")
+
+        self.keys = [None] * M
+        self.values = [None] * M
+        self.dist = [-1] * M          # probe distance from home slot, -1 is empty
+        self.M = M
+        self.N = 0
+        self.policy = policy or ResizePolicy()
+
+        self.threshold = self.policy.threshold(M)
+
+    def __len__(self):
+        return self.N
+
+    def find(self, k):
+        """Return slot holding k or -1. Stops as soon as a richer entry is met."""
+        hc = hash(k) % self.M
+        d = 0
+        while self.dist[hc] >= d:
+            if self.keys[hc] == k:
+                return hc
+            hc = (hc + 1) % self.M
+            d += 1
+        return -1
+
+    def get(self, k):
+        hc = self.find(k)
+        if hc < 0:
+            return None
+        return self.values[hc]
+
+    def put(self, k, v):
+        hc = hash(k) % self.M
+        d = 0
+        while self.dist[hc] >= 0:
+            if self.dist[hc] == d and self.keys[hc] == k:
+                self.values[hc] = v
+                return
+
+            if self.dist[hc] < d:
+                # Steal the slot from the richer entry and carry it forward
+                self.keys[hc], k = k, self.keys[hc]
+                self.values[hc], v = v, self.values[hc]
+                self.dist[hc], d = d, self.dist[hc]
+
+            hc = (hc + 1) % self.M
+            d += 1
+
+        self.keys[hc] = k
+        self.values[hc] = v
+        self.dist[hc] = d
+        self.N += 1
+
+        if self.N >= self.threshold:
+            self.resize(self.policy.grow_size(self.N, self.M))
+
+    def resize(self, new_size):
+        self.policy.resized(self.N)
+        temp = HashtableRobinHood(new_size, self.policy)
+        for k, v in self:
+            temp.put(k, v)
+        self.keys = temp.keys
+        self.values = temp.values
+        self.dist = temp.dist
+        self.M = temp.M
+        self.threshold = temp.threshold
+
+    def remove(self, k):
+        hc = self.find(k)
+        if hc < 0:
+            return None
+
+        result = self.values[hc]
+        self.N -= 1
+
+        # Backward shift: pull every displaced successor one slot closer to home
+        nxt = (hc + 1) % self.M
+        while self.dist[nxt] > 0:
+            self.keys[hc] = self.keys[nxt]
+            self.values[hc] = self.values[nxt]
+            self.dist[hc] = self.dist[nxt] - 1
+            hc, nxt = nxt, (nxt + 1) % self.M
+
+        self.keys[hc] = None
+        self.values[hc] = None
+        self.dist[hc] = -1
+
+        if self.N > 0 and self.policy.should_shrink(self.N, self.M):
+            self.resize(self.policy.shrink_size(self.N, self.M))
+
+        return result
+
+    def probe_lengths(self):
+        """Number of slots inspected by a successful get() of each stored key."""
+        return [d + 1 for d in self.dist if d >= 0]
+
+    def __iter__(self):
+        for i in range(self.M):
+            if self.dist[i] >= 0:
+                yield self.keys[i], self.values[i]
+
+
+def linear_probe_length(ht, k):
+    """Slots inspected by get(k) in a linear probing table with entries in ht.table."""
+    hc = hash(k) % ht.M
+    length = 1
+    while ht.table[hc]:
+        if ht.table[hc].key == k:
+            if not hasattr(ht.table[hc], "is_marked") or not ht.table[hc].is_marked():
+                return length
+        hc = (hc + 1) % ht.M
+        length += 1
+    return length
+
+
+def robin_hood_probe_length(ht, k):
+    """Slots inspected by get(k) in a HashtableRobinHood, including the early exit."""
+    hc = hash(k) % ht.M
+    d = 0
+    while ht.dist[hc] >= d:
+        if ht.keys[hc] == k:
+            return d + 1
+        hc = (hc + 1) % ht.M
+        d += 1
+    return d + 1
+
+
+def get_stats(lengths):
+    """Return max, mean, variance and histogram of probe lengths."""
+    if not lengths:
+        return 0, 0, 0, {}
+
+    histogram = {}
+    for length in lengths:
+        histogram[length] = histogram.get(length, 0) + 1
+
+    n = len(lengths)
+    mean = sum(lengths) / n
+    variance = sum((length - mean) ** 2 for length in lengths) / n
+    return max(lengths), mean, variance, dict(sorted(histogram.items()))
+
+
+def main(num_words=None, seed=11):
+    words = english_words(num_words)
+    random.seed(seed)
+    removed = set(random.sample(words, len(words) // 2))
+    kept = [w for w in words if w not in removed]
+    missing = [w + "!" for w in kept]
+
+    tables = [
+        ("tombstones (ch3_5)", Hashtable(1023), linear_probe_length),
+        ("cluster reinsertion (ch3_7)", HashtableOpenAddressingRemove(1023), linear_probe_length),
+        ("robin hood", HashtableRobinHood(1023), robin_hood_probe_length),
+    ]
+
+    for name, ht, probe_length in tables:
+        start = time.time()
+        for w in words:
+            ht.put(w, w)
+        for w in removed:
+            ht.remove(w)
+        build = time.time() - start
+
+        hits = get_stats([probe_length(ht, w) for w in kept])
+        misses = get_stats([probe_length(ht, w) for w in missing])
+        print(f"{name}: M={ht.M}, build+remove {build:.2f}s")
+        print(f"  hit  probes max={hits[0]}, mean={hits[1]:.3f}, variance={hits[2]:.3f}")
+        print(f"  miss probes max={misses[0]}, mean={misses[1]:.3f}, variance={misses[2]:.3f}")
+        print(f"  hit histogram: {hits[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import random
+import time
+
 
 class Entry:
     def __init__(self, v, p):
@@ -28,6 +31,43 @@ class PQ:
         self.storage[self.N] = Entry(v, p)
         self.swim(self.N)
 
+    @classmethod
+    def from_iterable(cls, pairs, size=None):
+        """Build a queue of (v, p) pairs in O(n) with a bottom-up heapify."""
+        entries = [Entry(v, p) for v, p in pairs]
+        pq = cls(len(entries) if size is None else size)
+        if len(entries) > pq.size:
+            raise RuntimeError("Priority queue is full.")
+
+        pq.storage[1:len(entries)+1] = entries
+        pq.N = len(entries)
+        pq.heapify()
+        return pq
+
+    def enqueue_many(self, pairs):
+        """
+        Enqueue every (v, p) pair. When at least as many pairs arrive as are
+        already queued, they are appended and the whole heap is rebuilt in
+        O(N); otherwise each one swims up as in enqueue().
+        """
+        entries = [Entry(v, p) for v, p in pairs]
+        if self.N + len(entries) > self.size:
+            raise RuntimeError("Priority queue is full.")
+
+        if len(entries) >= self.N:
+            self.storage[self.N+1:self.N+len(entries)+1] = entries
+            self.N += len(entries)
+            self.heapify()
+        else:
+            for entry in entries:
+                self.N += 1
+                self.storage[self.N] = entry
+                self.swim(self.N)
+
+    def heapify(self):
+        for k in range(self.N//2, 0, -1):
+            self.sink(k)
+
     def swim(self, child):
         while child > 1 and self.less(child//2, child):
             self.swap(child, child//2)
@@ -57,6 +97,28 @@ class PQ:
             parent = child
 
 
+def heapify_trial(n=10**6, seed=11):
+    """Incremental enqueue() loop versus from_iterable(), for ascending and random priorities."""
+    rng = random.Random(seed)
+    shuffled = list(range(n))
+    rng.shuffle(shuffled)
+    for name, priorities in [("ascending", range(n)), ("random", shuffled)]:
+        pairs = [(p, p) for p in priorities]
+
+        start = time.perf_counter()
+        pq = PQ(n)
+        for v, p in pairs:
+            pq.enqueue(v, p)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        built = PQ.from_iterable(pairs)
+        bulk = time.perf_counter() - start
+
+        assert built.storage[1].priority == pq.storage[1].priority == n - 1
+        print(f"{name} priorities: enqueue() loop {loop:.2f}s, from_iterable {bulk:.2f}s ({loop/bulk:.1f}x)")
+
+
 if __name__ == "__main__":
     k = 5
     N = 2**k - 1
@@ -77,3 +139,4 @@ if __name__ == "__main__":
     for i in range(k+1):
         print(pq_desc.storage[2**i:2**(i+1)])
 
+    heapify_trial()
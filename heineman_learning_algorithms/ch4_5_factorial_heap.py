@@ -65,7 +65,7 @@ class PQ:
             largest = fc
             offset = 1
             lev += 1
-            while fc+offset < self.N and offset <= lev:
+            while fc+offset <= self.N and offset <= lev:
                 if self.less(largest, fc+offset):
                     largest = fc+offset
                 offset += 1
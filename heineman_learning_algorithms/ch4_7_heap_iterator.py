@@ -1,4 +1,7 @@
 import random
+import time
+
+from itertools import islice
 
 
 class Entry:
@@ -64,6 +67,35 @@ class PQ:
     def is_empty(self):
         return self.N == 0
 
+    def iter_sorted(self, limit=None):
+        """
+        Yield (value, priority) pairs in priority order without changing the
+        heap. A frontier queue holds the indices of entries whose parent was
+        already yielded, so k pairs cost O(k log k) time and O(k) memory.
+        The heap must not be modified while iterating.
+        """
+        if limit is not None and limit < 0:
+            raise ValueError("limit must be None or a non-negative integer.")
+
+        n = self.N if limit is None else min(limit, self.N)
+        if n == 0:
+            return
+
+        # after t yields the frontier holds at most t+1 and at most N-t indices
+        frontier = PQ(min(n + 1, (self.N + 1)//2 + 1))
+        frontier.enqueue(1, self.storage[1].priority)
+        for _ in range(n):
+            idx = frontier.dequeue()
+            yield self.storage[idx].value, self.storage[idx].priority
+
+            for child in (2*idx, 2*idx + 1):
+                if child <= self.N:
+                    frontier.enqueue(child, self.storage[child].priority)
+
+    def top(self, k):
+        """The k (value, priority) pairs of highest priority, highest first."""
+        return list(self.iter_sorted(k))
+
 
 def iterator(pq):
     N = pq.N
@@ -71,7 +103,7 @@ def iterator(pq):
     pqit = PQ(N)
     pqit.enqueue(1, pq.peek().priority)
 
-    while pqit:
+    while not pqit.is_empty():
         idx = pqit.dequeue()
         yield pq.storage[idx].value, pq.storage[idx].priority
 
@@ -83,6 +115,26 @@ def iterator(pq):
             pqit.enqueue(child, pq.storage[child].priority)
 
 
+def top_trial(sizes=(10**4, 10**5, 10**6), k=100):
+    """top(k) should cost the same however large the heap is."""
+    for n in sizes:
+        pq = PQ(n)
+        for _ in range(n):
+            r = random.random()
+            pq.enqueue(r, r)
+
+        start = time.perf_counter()
+        top = pq.top(k)
+        lazy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = list(islice(iterator(pq), k))
+        eager = time.perf_counter() - start
+
+        assert top == full and pq.N == n
+        print(f"N={n:,}: top({k}) {1000*lazy:.2f} ms, iterator() with PQ(N) {1000*eager:.2f} ms")
+
+
 if __name__ == "__main__":
     size = 7
     pq = PQ(size)
@@ -95,3 +147,6 @@ if __name__ == "__main__":
 
     for p in iterator(pq):
         print(p)
+
+    print(pq.top(3))
+    top_trial()
@@ -0,0 +1,143 @@
+# Max-heap without an Entry object per element. Priorities and values are
+# kept in two parallel arrays (priorities optionally in a typed array, e.g.
+# array('d') for floats), comparisons are written inline, and swim/sink move
+# a hole up or down the heap and store the new element once at the end
+# instead of swapping pairs at every level.
+import random
+import time
+import tracemalloc
+
+from array import array
+
+from ch4_2_heap_array import PQ
+
+
+class CompactPQ:
+    def __init__(self, size, typecode=None):
+        self.size = size
+        self.typecode = typecode
+        if typecode is None:
+            self.priorities = [None] * (size+1)
+        else:
+            self.priorities = array(typecode, [0]) * (size+1)
+        self.values = [None] * (size+1)
+        self.N = 0
+
+    def __len__(self):
+        return self.N
+
+    def is_empty(self):
+        return self.N == 0
+
+    def peek(self):
+        """(value, priority) of the maximum, without removing it."""
+        if self.N == 0:
+            raise RuntimeError("Priority queue is empty.")
+        return self.values[1], self.priorities[1]
+
+    def enqueue(self, v, p):
+        if self.N == self.size:
+            raise RuntimeError("Priority queue is full.")
+
+        self.N += 1
+        self.swim(self.N, v, p)
+
+    def swim(self, child, v, p):
+        """Move the hole at child up past every smaller parent, then put (v, p) in it."""
+        priorities = self.priorities
+        values = self.values
+        while child > 1:
+            parent = child // 2
+            pp = priorities[parent]
+            if not pp < p:
+                break
+            priorities[child] = pp
+            values[child] = values[parent]
+            child = parent
+        priorities[child] = p
+        values[child] = v
+
+    def dequeue(self):
+        if self.N == 0:
+            raise RuntimeError("Priority queue is empty.")
+
+        N = self.N
+        max_value = self.values[1]
+        v = self.values[N]
+        p = self.priorities[N]
+        self.values[N] = None
+        if self.typecode is None:
+            self.priorities[N] = None
+        self.N = N - 1
+        if self.N:
+            self.sink(1, v, p)
+        return max_value
+
+    def sink(self, parent, v, p):
+        """Move the hole at parent down past every larger child, then put (v, p) in it."""
+        priorities = self.priorities
+        values = self.values
+        N = self.N
+        child = 2*parent
+        while child <= N:
+            cp = priorities[child]
+            if child < N and cp < priorities[child+1]:
+                child += 1
+                cp = priorities[child]
+
+            if not p < cp:
+                break
+
+            priorities[parent] = cp
+            values[parent] = values[child]
+            parent = child
+            child = 2*parent
+        priorities[parent] = p
+        values[parent] = v
+
+
+def run(pq, priorities):
+    """Enqueue every priority, then dequeue everything; returns the values in order and both times."""
+    start = time.perf_counter()
+    for i, p in enumerate(priorities):
+        pq.enqueue(i, p)
+    enqueue_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    out = [pq.dequeue() for _ in range(len(priorities))]
+    return out, enqueue_time, time.perf_counter() - start
+
+
+def peak_memory(make, priorities):
+    """Peak bytes allocated while filling the queue."""
+    tracemalloc.start()
+    pq = make()
+    for i, p in enumerate(priorities):
+        pq.enqueue(i, p)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(n=10**6, seed=7):
+    rng = random.Random(seed)
+    priorities = [rng.random() for _ in range(n)]
+
+    queues = [
+        ("PQ (Entry objects)", lambda: PQ(n)),
+        ("CompactPQ (list)", lambda: CompactPQ(n)),
+        ("CompactPQ (array('d'))", lambda: CompactPQ(n, "d")),
+    ]
+    expected = None
+    for name, make in queues:
+        out, enqueue_time, dequeue_time = run(make(), priorities)
+        if expected is None:
+            expected = out
+        assert out == expected
+        memory = peak_memory(make, priorities)
+        print(f"{name}: enqueue {n/enqueue_time:,.0f} ops/s, dequeue {n/dequeue_time:,.0f} ops/s, "
+              f"peak {memory / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
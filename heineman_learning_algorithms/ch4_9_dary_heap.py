@@ -0,0 +1,145 @@
+# Max-heap where every node has d children (d = 2, 4, 8, 16, ...). Entries
+# are stored from index 0, so the children of i are d*i+1 .. d*i+d and its
+# parent is (i-1)//d, for any size. Priorities and values are kept in two
+# parallel lists, and swim/sink move a hole as in ch4_8_compact_heap. A larger
+# d makes the heap shallower (cheaper enqueue), but sink has to find the
+# largest of d children at every level (costlier dequeue).
+import random
+import time
+
+from ch4_2_heap_array import PQ as BinaryPQ
+from ch4_5_factorial_heap import PQ as FactorialPQ
+
+
+class DaryPQ:
+    def __init__(self, d=4, size=None):
+        if d < 2:
+            raise ValueError("Every node needs at least 2 children.")
+
+        self.d = d
+        self.size = size            # None means no limit
+        self.priorities = []
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def is_empty(self):
+        return not self.values
+
+    def peek(self):
+        """(value, priority) of the maximum, without removing it."""
+        if not self.values:
+            raise RuntimeError("Priority queue is empty.")
+        return self.values[0], self.priorities[0]
+
+    def enqueue(self, v, p):
+        if self.size is not None and len(self.values) == self.size:
+            raise RuntimeError("Priority queue is full.")
+
+        self.priorities.append(p)
+        self.values.append(v)
+        self.swim(len(self.values) - 1, v, p)
+
+    def swim(self, child, v, p):
+        """Move the hole at child up past every smaller parent, then put (v, p) in it."""
+        d = self.d
+        priorities = self.priorities
+        values = self.values
+        while child > 0:
+            parent = (child - 1) // d
+            pp = priorities[parent]
+            if not pp < p:
+                break
+            priorities[child] = pp
+            values[child] = values[parent]
+            child = parent
+        priorities[child] = p
+        values[child] = v
+
+    def dequeue(self):
+        if not self.values:
+            raise RuntimeError("Priority queue is empty.")
+
+        max_value = self.values[0]
+        p = self.priorities.pop()
+        v = self.values.pop()
+        if self.values:
+            self.sink(0, v, p)
+        return max_value
+
+    def sink(self, parent, v, p):
+        """Move the hole at parent down past the largest child while it beats p, then put (v, p) in it."""
+        d = self.d
+        priorities = self.priorities
+        values = self.values
+        N = len(values)
+        first = d*parent + 1
+        while first < N:
+            child = first
+            cp = priorities[first]
+            for c in range(first + 1, min(first + d, N)):
+                if cp < priorities[c]:
+                    child = c
+                    cp = priorities[c]
+            if not p < cp:
+                break
+
+            priorities[parent] = cp
+            values[parent] = values[child]
+            parent = child
+            first = d*parent + 1
+        priorities[parent] = p
+        values[parent] = v
+
+
+def workload(n, enqueue_ratio, seed):
+    """n operations after prefilling n/2 entries: a priority to enqueue, or None to dequeue."""
+    rng = random.Random(seed)
+    prefill = [rng.random() for _ in range(n // 2)]
+    ops = [rng.random() if rng.random() < enqueue_ratio else None for _ in range(n)]
+    return prefill, ops
+
+
+def run(pq, prefill, ops):
+    """Returns the dequeued values and the time spent on ops (prefill is not timed)."""
+    for p in prefill:
+        pq.enqueue(p, p)
+
+    out = []
+    queued = len(prefill)
+    start = time.perf_counter()
+    for p in ops:
+        if p is not None:
+            pq.enqueue(p, p)
+            queued += 1
+        elif queued:
+            out.append(pq.dequeue())
+            queued -= 1
+    return out, time.perf_counter() - start
+
+
+def main(n=200_000, seed=3, repeat=3):
+    capacity = n + n // 2
+    heaps = [
+        ("binary (ch4_2)", lambda: BinaryPQ(capacity)),
+        ("factorial (ch4_5)", lambda: FactorialPQ(capacity)),
+    ] + [(f"{d}-ary", lambda d=d: DaryPQ(d)) for d in [2, 4, 8, 16]]
+
+    for name, ratio in [("enqueue-heavy", 0.9), ("balanced", 0.5), ("dequeue-heavy", 0.1)]:
+        prefill, ops = workload(n, ratio, seed)
+        print(f"\n{name}: {n:,} operations, {ratio:.0%} enqueue, {len(prefill):,} prefilled")
+        expected = None
+        for heap, make in heaps:
+            elapsed = float("inf")
+            for _ in range(repeat):
+                out, t = run(make(), prefill, ops)
+                elapsed = min(elapsed, t)
+            if expected is None:
+                expected = out
+            assert out == expected, heap
+            print(f"  {heap}: {n/elapsed:,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
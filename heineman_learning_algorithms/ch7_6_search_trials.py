@@ -1,4 +1,5 @@
 import random
+import tracemalloc
 import networkx as nx
 
 
@@ -283,6 +284,46 @@ class PQ:
         return max_entry.value
 
 
+class GrowablePQ(PQ):
+    """
+    Priority queue whose storage starts at `size` slots and doubles whenever
+    it is full, so memory follows the live number of entries instead of the
+    worst case. With shrink=True, storage halves once it is at most a quarter
+    full, but never drops below the initial size.
+    """
+    def __init__(self, size=8, shrink=False):
+        super().__init__(max(1, size))
+        self.min_size = self.size
+        self.shrink = shrink
+        self.max_size = self.size
+
+    def is_full(self):
+        """A growable priority queue never runs out of storage."""
+        return False
+
+    def resize(self, new_size):
+        """Change capacity to new_size, which must hold all N entries."""
+        if new_size > self.size:
+            self.storage.extend([None] * (new_size - self.size))
+        else:
+            del self.storage[new_size+1:]
+        self.size = new_size
+        self.max_size = max(self.max_size, new_size)
+
+    def enqueue(self, v, p):
+        """Enqueue (v, p) entry, doubling storage first if it is full."""
+        if self.N == self.size:
+            self.resize(2 * self.size)
+        super().enqueue(v, p)
+
+    def dequeue(self):
+        """Remove and return value with highest priority, shrinking storage if enabled."""
+        value = super().dequeue()
+        if self.shrink and self.size > self.min_size and self.N <= self.size // 4:
+            self.resize(max(self.min_size, self.size // 2))
+        return value
+
+
 def distance_to(from_cell, to_cell):
     return abs(from_cell[0] - to_cell[0]) + abs(from_cell[1] - to_cell[1])
 
@@ -361,7 +402,7 @@ def annotated_bfs_search(G, src, target):
     return len(marked)
 
 
-def annotated_guided_search(G, src, target, distance):
+def annotated_guided_search(G, src, target, distance, pq=None):
     """
     Non-recursive depth-first search investigating given position. Needs
     a distance (node1, node2) function to determine distance between two nodes.
@@ -370,12 +411,14 @@ def annotated_guided_search(G, src, target, distance):
     graph and twice for an undirected graph. Each of the N nodes is processed by
     the priority queue, where dequeue() and enqueue() operations are each O(log N).
     While it is unlikely that the priority queue will ever contain N nodes, the
-    worst case possibility always exists.
+    worst case possibility always exists, which is why the default priority
+    queue grows with the frontier instead of reserving N slots up front.
     """
     marked = {}
     node_from = {}
 
-    pq = PQ(G.number_of_nodes())
+    if pq is None:
+        pq = GrowablePQ()
     marked[src] = True
 
     # Using a MAX PRIORITY QUEUE means we rely on negative distance to
@@ -442,3 +485,40 @@ def search_trials():
         num_bfs = annotated_bfs_search(G, m.start(), m.end())
         num_dfs = annotated_dfs_search(G, m.start(), m.end())
         num_gs = annotated_guided_search(G, m.start(), m.end(), distance_to)
+
+
+def guided_search_memory(sizes=(32, 64, 128, 256), num_random=16):
+    """
+    Peak memory of annotated_guided_search() with a PQ preallocated for every
+    node versus a GrowablePQ, on the maze that defeats guided search and on
+    random mazes.
+    """
+    def peak(G, m, make_pq):
+        tracemalloc.start()
+        pq = make_pq()
+        annotated_guided_search(G, m.start(), m.end(), distance_to, pq)
+        result = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, pq
+
+    for N in sizes:
+        mazes = [('defeat', maze_to_defeat_guided_search(N))]
+        for i in range(num_random):
+            random.seed(i)
+            mazes.append(('random', Maze(N, N)))
+
+        for kind in ['defeat', 'random']:
+            fixed = grown = capacity = 0
+            group = [m for k, m in mazes if k == kind]
+            for m in group:
+                G = to_networkx(m)
+                fixed = max(fixed, peak(G, m, lambda: PQ(G.number_of_nodes()))[0])
+                used, pq = peak(G, m, GrowablePQ)
+                grown = max(grown, used)
+                capacity = max(capacity, pq.max_size)
+            print('{}x{} {} maze: fixed PQ({}) peak {:.1f} KiB, growable peak {:.1f} KiB (capacity {})'.format(
+                N, N, kind, N*N, fixed / 1024, grown / 1024, capacity))
+
+
+if __name__ == '__main__':
+    guided_search_memory()